@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Scene actors
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import threading
+import numpy as np
+
+from python_bvh import BVHNode
+from Kinematics import ForwardKinematics, PoseTrack, batchPositions
+from BVHStream import LazyMotion
+
+# (bone, joint) colors handed out to added actors in turn
+palette = [((0.118, 0.565, 1.000), (0.000, 0.392, 1.000)),
+           ((0.863, 0.078, 0.235), (0.698, 0.000, 0.122)),
+           ((0.604, 0.804, 0.196), (0.420, 0.557, 0.137)),
+           ((0.855, 0.439, 0.839), (0.729, 0.333, 0.827)),
+           ((1.000, 0.843, 0.000), (0.855, 0.647, 0.125)),
+           ((0.251, 0.878, 0.816), (0.000, 0.545, 0.545))]
+
+# One performer in the scene: a motion plus where, in what color and how late it plays
+class Actor:
+    def __init__(self, name, root:BVHNode, motion, frames:int, frameTime:float, offset=(0.0, 0.0, 0.0), color=None,
+                 timeOffset=0.0, precomputeBytes=None, interpolate=True):
+        self.name = name
+        self.root = root
+        self.motion = motion
+        self.frames = frames
+        self.frameTime = frameTime
+        self.offset = np.array(offset, dtype=np.float64)
+        self.color = color      # (boneColor, jointColor); None follows the widget's draw mode
+        self.timeOffset = timeOffset    # seconds on the shared clock before frame 0 plays
+        self.frameMap = None    # frame shown at each frame of the primary actor, for a compared take
+        self.kinematics = ForwardKinematics(root)
+        # Only what playback reads is precomputed, within precomputeBytes (None: no limit):
+        # the quaternion track when poses are interpolated, whole-frame points otherwise
+        cost = precomputedSize(self.kinematics, len(motion), interpolate)
+        fPrecompute = isinstance(motion, np.ndarray) and ((precomputeBytes is None) or (cost <= precomputeBytes))
+        self.positions = None
+        self.poseTrack = PoseTrack(self.kinematics, motion, precompute=False)
+        self.precomputedBytes = cost if fPrecompute else 0     # streamed or very long motions are evaluated on demand
+        self.fCancel = False
+        self.precomputeThread = None
+        if fPrecompute:     # built off the GUI thread; poses are evaluated on demand meanwhile
+            self.precomputeThread = threading.Thread(target=self.precompute, args=(interpolate,), daemon=True)
+            self.precomputeThread.start()
+
+    def precompute(self, interpolate):
+        if interpolate:
+            self.poseTrack.precompute(isCancelled=self.isCancelled)
+            return
+        chunkSize = self.kinematics.chunkSize
+        positions = np.empty((len(self.motion), self.kinematics.numPoints, 3), dtype=np.float32)
+        for begin in range(0, len(self.motion), chunkSize):
+            if self.fCancel:
+                return
+            positions[begin:begin + chunkSize] = self.kinematics.jointPositions(self.motion[begin:begin + chunkSize])
+        self.positions = positions      # published whole; scenePoses evaluates on demand until then
+
+    # Stops building the precomputed poses of an actor leaving the scene
+    def cancelPrecompute(self):
+        self.fCancel = True
+
+    def isCancelled(self):
+        return self.fCancel
+
+    # Frames that can be shown now; a streamed motion grows while it is indexed
+    def availableFrames(self):
+        if isinstance(self.motion, LazyMotion) and not self.motion.isIndexed:
+            return max(1, self.motion.availableFrames)
+        return self.frames
+
+    def framePosition(self, seconds):
+        return ((seconds - self.timeOffset) / self.frameTime) % self.availableFrames()
+
+    # Compared takes follow the primary actor's frame through frameMap, others the clock
+    def followPosition(self, primaryPosition, seconds):
+        if self.frameMap is not None:
+            return float(self.frameMap[int(primaryPosition) % len(self.frameMap)])
+        return self.framePosition(seconds)
+
+
+# Bytes an Actor precomputes for a motion of the given length (see Actor.__init__)
+def precomputedSize(kinematics:ForwardKinematics, frames, interpolate=True):
+    itemsize = np.dtype(np.float32).itemsize
+    if interpolate:
+        return frames * (kinematics.numJoints * 4 + int(kinematics.hasPosition.sum()) * 3) * itemsize
+    return frames * kinematics.numPoints * 3 * itemsize
+
+# World-space points of every actor at the given fractional frames. Precomputed
+# (or cached) whole frames are looked up; the rest is evaluated in one forward
+# kinematics pass per distinct topology, however many actors share it.
+def scenePoses(actors, positions, interpolate=True, poseCache=None):
+    poses = [None] * len(actors)
+    groups = {}
+    for i, (actor, position) in enumerate(zip(actors, positions)):
+        if not interpolate:
+            position = np.floor(position)
+        fWhole = position == np.floor(position)
+        if fWhole and (actor.positions is not None):
+            poses[i] = actor.positions[int(position) % len(actor.positions)]
+        elif fWhole and (poseCache is not None):
+            poses[i] = poseCache.get(actor, int(position) % actor.frames)
+        if poses[i] is None:
+            groups.setdefault(actor.kinematics.topologyKey, []).append((i, position))
+
+    for members in groups.values():
+        batch = batchPositions([actors[i].poseTrack for i, _ in members], [position for _, position in members])
+        for (i, position), pose in zip(members, batch):
+            poses[i] = pose
+            if (poseCache is not None) and (position == np.floor(position)):
+                poseCache.put(actors[i], int(position) % actors[i].frames, pose)
+    return [pose + actor.offset for actor, pose in zip(actors, poses)]
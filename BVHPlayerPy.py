@@ -2,7 +2,7 @@
  
 # "BVHPlayerPy" Startup Scripts
 # Author: T.Shuhei
-# Last Modified: 2017/09/28
+# Last Modified: 2026/10/18
 
 import sys
 import os
@@ -13,15 +13,33 @@ from GLWidget import GLWidget
 from InfoWidget import InfoWidget
 from ControlWidget import ControlWidget
 from SplitWidget import SplitWidget
-from python_bvh import BVH
+from TimelineWidget import TimelineWidget
+from BVHStream import LazyMotion
+from Actor import palette
+from MotionCache import MotionCache
+from MotionLoader import MotionLoader
+from PositionExport import exportPositions
+from LibraryWidget import LibraryWidget
+from MotionLibrary import hierarchySignature
 
 class BVHPlayerPy(QMainWindow):
+    streamingThreshold = 64 * 1024 * 1024   # bytes; larger files are opened with the streaming loader
+
     def __init__(self, pathCD):
         super().__init__()
-        self.setMaximumSize(800, 500)
+        self.setMaximumSize(800, 580)
         
         self.pathCurrentDir = pathCD
         self.pathMotionFileDir = pathCD.rstrip(os.path.basename(pathCD))
+        self.motionCache = MotionCache()
+        self.loader = None
+        self.backgroundLoaders = []     # running loaders whose motion is shown (still indexing) or was cancelled
+        self.retiredMotions = []        # streamed motions to close once their loader has finished
+        self.pendingActors = []    # files still to be added by "Add Actor..."
+        self.comparedActor = None
+        self.fAlignTakes = True
+        self.libraryPanel = None
+        self.fCompressMotion = False
 
         self.setCentralWidget(self.initComponent())
         menuBar = self.menuBar()
@@ -32,10 +50,61 @@ class BVHPlayerPy(QMainWindow):
         loadAction.triggered.connect(self.loadFile)
         loadAction.setShortcut("Ctrl+l")
         fileMenu.addAction(loadAction)
+        libraryAction = QAction("Motion &Library...", self)
+        libraryAction.triggered.connect(self.showLibrary)
+        libraryAction.setShortcut("Ctrl+Shift+o")
+        fileMenu.addAction(libraryAction)
+        addActorAction = QAction("&Add Actor...", self)
+        addActorAction.triggered.connect(self.addActorFile)
+        addActorAction.setShortcut("Ctrl+Shift+l")
+        fileMenu.addAction(addActorAction)
+        compareAction = QAction("Co&mpare With...", self)
+        compareAction.triggered.connect(self.compareFile)
+        fileMenu.addAction(compareAction)
+        alignAction = QAction("A&lign Compared Takes", self)
+        alignAction.setCheckable(True)
+        alignAction.setChecked(self.fAlignTakes)
+        alignAction.toggled.connect(self.setAlignTakes)
+        fileMenu.addAction(alignAction)
+        exportAction = QAction("&Export Joint Positions...", self)
+        exportAction.triggered.connect(self.exportPositions)
+        fileMenu.addAction(exportAction)
+        cacheAction = QAction("Use Parse &Cache", self)
+        cacheAction.setCheckable(True)
+        cacheAction.setChecked(self.motionCache.enabled)
+        cacheAction.toggled.connect(self.setCacheEnabled)
+        fileMenu.addAction(cacheAction)
+        compressAction = QAction("Compress Motions (Quantizes Exports)", self)
+        compressAction.setCheckable(True)
+        compressAction.setChecked(self.fCompressMotion)
+        compressAction.setStatusTip("Keep parsed motions and cache entries quantized and compressed; "
+                                    "splits and exports made while this is on carry the quantization error")
+        compressAction.toggled.connect(self.setCompressMotion)
+        fileMenu.addAction(compressAction)
         quitAction = QAction("&Quit...", self)
         quitAction.triggered.connect(self.quit)
         quitAction.setShortcut("Ctrl+q")
         fileMenu.addAction(quitAction)
+
+        viewMenu = menuBar.addMenu("&View")
+        profilingAction = QAction("&Profiling Overlay", self)
+        profilingAction.setCheckable(True)
+        profilingAction.toggled.connect(self.drawPanel.setProfiling)
+        profilingAction.setShortcut("Ctrl+p")
+        viewMenu.addAction(profilingAction)
+        ghostAction = QAction("&Onion Skin Offsets...", self)
+        ghostAction.triggered.connect(self.chooseGhostOffsets)
+        viewMenu.addAction(ghostAction)
+        trailAction = QAction("Joint T&rails", self)
+        trailAction.setCheckable(True)
+        trailAction.toggled.connect(self.drawPanel.setTrails)
+        viewMenu.addAction(trailAction)
+        trailJointsAction = QAction("Trail &Joints...", self)
+        trailJointsAction.triggered.connect(self.chooseTrailJoints)
+        viewMenu.addAction(trailJointsAction)
+        traceAction = QAction("Save Profiling &Trace...", self)
+        traceAction.triggered.connect(self.saveTrace)
+        viewMenu.addAction(traceAction)
         self.setMenuBar(menuBar)
         self.setWindowTitle("BVH Player")
 
@@ -44,13 +113,22 @@ class BVHPlayerPy(QMainWindow):
         self.infoPanel = InfoWidget(self)
         self.controlPanel = ControlWidget(self)
         self.splitterPanel = SplitWidget(self)
+        self.timelinePanel = TimelineWidget(self)
+        self.drawPanel.frameChanged.connect(self.timelinePanel.setFrame)
+        self.drawPanel.frameChanged.connect(self.infoPanel.updateFrameCount)
+        self.timelinePanel.comparisonReady.connect(self.setComparison)
+        self.timelinePanel.comparisonFailed.connect(self.comparisonFailed)
         controlLayout = QVBoxLayout()
         controlLayout.addWidget(self.infoPanel)
         controlLayout.addWidget(self.controlPanel)
         controlLayout.addWidget(self.splitterPanel)
 
+        viewLayout = QVBoxLayout()
+        viewLayout.addWidget(self.drawPanel)
+        viewLayout.addWidget(self.timelinePanel)
+
         mainLayout = QHBoxLayout()
-        mainLayout.addWidget(self.drawPanel)
+        mainLayout.addLayout(viewLayout)
         mainLayout.addLayout(controlLayout)
         mainWidget = QWidget()
         mainWidget.setLayout(mainLayout)
@@ -60,19 +138,252 @@ class BVHPlayerPy(QMainWindow):
     def quit(self):
         sys.exit()
 
+    def setCacheEnabled(self, fEnable):
+        self.motionCache.enabled = fEnable
+
+    # Applies to files opened from now on
+    def setCompressMotion(self, fEnable):
+        self.fCompressMotion = fEnable
+        self.motionCache.compress = fEnable
+
     def loadFile(self):
         filePath = QFileDialog.getOpenFileName(self, "Choose Motion File...", self.pathMotionFileDir, "Biovision Hierarchy (*.bvh)")
         if filePath[0] == "":
 #            print("Error: Motion file is not given")
             pass
         else:
-            root, motion, frames, frameTime = BVH.readBVH(filePath[0])
-            self.pathMotionFileDir = os.path.dirname(filePath[0])
-            self.drawPanel.setMotion(root, motion, frames, frameTime)
-            self.infoPanel.initInfo(os.path.basename(filePath[0]), frameTime, frames)
-            self.controlPanel.setPlayMode(True)
-            self.splitterPanel.setActive()
-            self.splitterPanel.initMotionData(os.path.basename(filePath[0]), root, motion, frameTime)
+            self.openFile(filePath[0])
+
+    def showLibrary(self):
+        if self.libraryPanel is None:
+            self.libraryPanel = LibraryWidget(self)
+        self.libraryPanel.show()
+        self.libraryPanel.raise_()
+
+    def currentSignature(self):
+        return hierarchySignature(self.drawPanel.kinematics)
+
+    # Adds motion files to the current scene instead of replacing it
+    def addActorFile(self):
+        filePaths = QFileDialog.getOpenFileNames(self, "Choose Motion Files...", self.pathMotionFileDir, "Biovision Hierarchy (*.bvh)")
+        self.pendingActors = list(filePaths[0])
+        self.openNextActor()
+
+    def openNextActor(self):
+        if len(self.pendingActors) != 0:
+            self.openFile(self.pendingActors.pop(0), fAddActor=True)
+
+    # Overlays a second take of the same skeleton and plots its error against the current one
+    def compareFile(self):
+        if self.drawPanel.motion is None:
+            return
+        filePath = QFileDialog.getOpenFileName(self, "Choose Take to Compare...", self.pathMotionFileDir, "Biovision Hierarchy (*.bvh)")
+        if filePath[0] != "":
+            self.openFile(filePath[0], fCompare=True)
+
+    def setAlignTakes(self, fAlign):
+        self.fAlignTakes = fAlign
+
+    # Ghost poses at frame offsets from the current one, e.g. "-20, -10, 10, 20"; empty turns them off
+    def chooseGhostOffsets(self):
+        current = ", ".join(str(offset) for offset in self.drawPanel.ghostOffsets)
+        text, fOk = QInputDialog.getText(self, "Onion Skin", "Frame offsets (comma separated):", QLineEdit.Normal, current)
+        if not fOk:
+            return
+        try:
+            offsets = [int(item) for item in text.replace(",", " ").split()]
+        except ValueError:
+            QMessageBox.warning(self, "BVH Player", "Frame offsets must be integers.")
+            return
+        self.drawPanel.setGhostOffsets(offsets)
+
+    # Joints of the current motion whose paths are traced; none checked traces the end sites
+    def chooseTrailJoints(self):
+        if self.drawPanel.kinematics is None:
+            return
+        names = self.drawPanel.kinematics.skeleton.names
+        selected = self.drawPanel.trailJoints or []
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Trail Joints")
+        jointList = QListWidget()
+        for name in names:
+            item = QListWidgetItem(name)
+            item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
+            item.setCheckState(Qt.Checked if name in selected else Qt.Unchecked)
+            jointList.addItem(item)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        layout = QVBoxLayout()
+        layout.addWidget(jointList)
+        layout.addWidget(buttons)
+        dialog.setLayout(layout)
+        if dialog.exec_() == QDialog.Accepted:
+            checked = [jointList.item(i).text() for i in range(jointList.count()) if jointList.item(i).checkState() == Qt.Checked]
+            self.drawPanel.setTrailJoints(checked if len(checked) != 0 else None)
+
+    # Chrome trace JSON of the recorded render loop stages
+    def saveTrace(self):
+        filePath = QFileDialog.getSaveFileName(self, "Save Profiling Trace...", self.pathMotionFileDir, "Chrome Trace (*.json)")[0]
+        if filePath != "":
+            try:
+                self.drawPanel.profiler.saveTrace(filePath)
+            except OSError as e:
+                QMessageBox.warning(self, "BVH Player", "Failed to save the trace.\n" + str(e))
+
+    # World-space positions of every frame of the current motion
+    def exportPositions(self):
+        if self.drawPanel.motion is None:
+            return
+        filePath, selected = QFileDialog.getSaveFileName(self, "Export Joint Positions...", self.pathMotionFileDir,
+                                                         "NumPy (*.npy);;Parquet (*.parquet);;CSV (*.csv)")
+        if filePath == "":
+            return
+        fileFormat = os.path.splitext(filePath)[1].lstrip(".").lower()
+        if fileFormat not in ("npy", "parquet", "csv"):
+            fileFormat = selected.split("*.")[1].rstrip(")")
+            filePath += "." + fileFormat
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            exportPositions(filePath, self.drawPanel.root, self.drawPanel.motion, fileFormat=fileFormat, fRotations=True)
+        except (OSError, ImportError) as e:
+            QMessageBox.warning(self, "BVH Player", "Failed to export joint positions.\n" + str(e))
+        finally:
+            QApplication.restoreOverrideCursor()
+
+    def openFile(self, filePath, fAddActor=False, fCompare=False):
+        self.cancelLoading()
+        if not fAddActor:
+            self.pendingActors = []
+        self.pathMotionFileDir = os.path.dirname(filePath)
+        self.infoPanel.updateLoadProgress(0, max(1, os.path.getsize(filePath)), 0)
+        self.loader = MotionLoader(filePath, self.motionCache, self.streamingThreshold, self, self.fCompressMotion)
+        if fCompare:
+            self.loader.motionReady.connect(self.compareTakeData)
+        elif fAddActor:
+            self.loader.motionReady.connect(self.addActorData)
+        else:
+            self.loader.motionReady.connect(self.setMotionData)
+        self.loader.progress.connect(self.updateLoadProgress)
+        self.loader.failed.connect(self.loadFailed)
+        self.loader.finished.connect(self.loadFinished)
+        self.loader.start()
+
+    # Cancels the pending load, if any; loaders of motions already shown keep indexing
+    def cancelLoading(self):
+        if self.loader is not None:
+            self.loader.motionReady.disconnect()
+            self.stopLoader(self.loader)
+            self.backgroundLoaders.append(self.loader)
+            self.loader = None
+            self.infoPanel.finishLoadProgress()
+
+    # Cancels without waiting: a whole-file parse cannot stop early, so the loader
+    # runs to its end and is deleted in loadFinished
+    def stopLoader(self, loader):
+        if not loader.isCancelled():
+            loader.cancel()
+            loader.progress.disconnect()
+            loader.failed.disconnect()
+
+    # The shown motion goes on indexing (and into the cache) on its own loader, which
+    # is no longer the pending load, so opening more files does not cut it short
+    def keepLoading(self):
+        self.loader.motionReady.disconnect()
+        self.backgroundLoaders.append(self.loader)
+        self.loader = None
+
+    # Closes a streamed motion that left the scene, once no loader reads it any more
+    def retireMotion(self, motion):
+        if not isinstance(motion, LazyMotion):
+            return
+        loaders = [loader for loader in self.backgroundLoaders if loader.motion is motion]
+        for loader in loaders:
+            self.stopLoader(loader)
+        if len(loaders) != 0:
+            self.retiredMotions.append(motion)
+        else:
+            motion.close()
+
+    def setMotionData(self, filePath, root, motion, frames, frameTime):
+        if self.sender() is not self.loader:
+            return
+        self.keepLoading()
+        previous = [actor.motion for actor in self.drawPanel.actors]
+        self.comparedActor = None
+        # every reader of the previous motions is replaced or cancelled before they are closed
+        self.drawPanel.setMotion(root, motion, frames, frameTime, os.path.basename(filePath))
+        self.timelinePanel.setMotion(self.drawPanel.actors[0])
+        self.infoPanel.initInfo(os.path.basename(filePath), frameTime, frames)
+        self.infoPanel.updateMemory(motion)
+        self.controlPanel.setPlayMode(True)
+        self.splitterPanel.setActive()
+        self.splitterPanel.initMotionData(os.path.basename(filePath), root, motion, frameTime)
+        for previousMotion in previous:
+            if previousMotion is not motion:
+                self.retireMotion(previousMotion)
+
+    def addActorData(self, filePath, root, motion, frames, frameTime):
+        if self.sender() is not self.loader:
+            return
+        if len(self.drawPanel.actors) == 0:
+            self.setMotionData(filePath, root, motion, frames, frameTime)
+        else:
+            self.keepLoading()
+            self.drawPanel.addActor(root, motion, frames, frameTime, os.path.basename(filePath))
+        self.openNextActor()
+
+    # The compared take is drawn on top of the current one and replaces any earlier one
+    def compareTakeData(self, filePath, root, motion, frames, frameTime):
+        if self.sender() is not self.loader:
+            return
+        self.keepLoading()
+        actors = self.drawPanel.actors
+        previous = None
+        if self.comparedActor in actors:
+            previous = self.comparedActor
+            actors.remove(previous)
+            previous.cancelPrecompute()
+            self.drawPanel.poseCache.discard(previous)
+        self.comparedActor = self.drawPanel.addActor(root, motion, frames, frameTime, os.path.basename(filePath),
+                                                     offset=(0.0, 0.0, 0.0), color=palette[1])
+        self.timelinePanel.compare(actors[0], self.comparedActor, self.fAlignTakes)    # cancels the previous comparison
+        if previous is not None:
+            self.retireMotion(previous.motion)
+
+    def setComparison(self, comparison):
+        if self.comparedActor is not None:
+            self.comparedActor.frameMap = comparison.matches
+            self.drawPanel.update()
+
+    def comparisonFailed(self, message):
+        QMessageBox.warning(self, "BVH Player", "Failed to compare the takes.\n" + message)
+
+    # The pending load's progress, or else that of shown motions still being indexed
+    def updateLoadProgress(self, bytesDone, bytesTotal, frames):
+        if (self.sender() is self.loader) or (self.loader is None):
+            self.infoPanel.updateLoadProgress(bytesDone, bytesTotal, frames)
+
+    def loadFailed(self, message):
+        if (self.sender() is self.loader) or (self.sender() in self.backgroundLoaders):
+            QMessageBox.warning(self, "BVH Player", "Failed to load motion file.\n" + message)
+
+    def loadFinished(self):
+        loader = self.sender()
+        if loader is self.loader:
+            self.infoPanel.finishLoadProgress()
+            self.loader = None
+            self.openNextActor()
+        elif loader in self.backgroundLoaders:
+            self.backgroundLoaders.remove(loader)
+            if self.loader is None:
+                self.infoPanel.finishLoadProgress()
+        else:
+            return
+        if any(motion is loader.motion for motion in self.retiredMotions):
+            self.retiredMotions = [motion for motion in self.retiredMotions if motion is not loader.motion]
+            loader.motion.close()
+        loader.deleteLater()
 
     def keyPressEvent(self, event:QKeyEvent):
         if event.key() == Qt.Key_Escape:
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Streaming BVH loader
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import os
+import mmap
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+
+from python_bvh import BVH
+
+# MOTION section as a read-only (frames, channels) array-like. Line offsets are
+# indexed incrementally and frames are decoded per chunk on first access.
+class LazyMotion:
+    chunkFrames = 1024
+    cacheChunks = 64
+    indexBlockBytes = 16 * 1024 * 1024
+    ndim = 2
+    dtype = np.dtype(np.float64)
+
+    def __init__(self, filePath, motionOffset, frames, channels):
+        self.filePath = filePath
+        self.frames = frames
+        self.channels = channels
+        self.fileHandle = open(filePath, "rb")
+        self.size = os.fstat(self.fileHandle.fileno()).st_size
+        self.mm = mmap.mmap(self.fileHandle.fileno(), 0, access=mmap.ACCESS_READ) if self.size > 0 else b""
+        self.lock = threading.RLock()
+
+        self.motionOffset = motionOffset
+        self.indexPos = motionOffset
+        self.indexedFrames = 0
+        self.lineStart = motionOffset   # start of the line the last block ended in
+        self.fLineFilled = False        # whether that line has a non-blank byte so far
+        self.chunkOffsets = []      # byte offset of frame k * chunkFrames
+        self.chunkCache = OrderedDict()
+
+    @property
+    def shape(self):
+        return (self.frames, self.channels)
+
+    @property
+    def availableFrames(self):
+        return min(self.indexedFrames, self.frames)
+
+    @property
+    def isIndexed(self):
+        return self.indexPos >= self.size
+
+    def __len__(self):
+        return self.frames
+
+    def __array__(self, dtype=None, copy=None):
+        result = self[0:self.frames]
+        return result if dtype is None else result.astype(dtype)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            rows = self[key[0]]
+            return rows[(Ellipsis,) + key[1:]] if np.ndim(rows) == 1 else rows[(slice(None),) + key[1:]]
+        if isinstance(key, slice):
+            begin, end, step = key.indices(self.frames)
+            if step != 1:
+                return self[begin:end][::step] if step > 0 else self[np.arange(begin, end, step)]
+            return self.rows(begin, end)
+        if isinstance(key, (int, np.integer)):
+            frame = int(key) + self.frames if key < 0 else int(key)
+            if not 0 <= frame < self.frames:
+                raise IndexError("frame index out of range")
+            return self.rows(frame, frame + 1)[0]
+        indices = np.asarray(key)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        indices = np.where(indices < 0, indices + self.frames, indices)
+        result = np.empty((len(indices), self.channels), dtype=self.dtype)
+        for chunk in np.unique(indices // self.chunkFrames):
+            mask = (indices // self.chunkFrames) == chunk
+            result[mask] = self.chunk(chunk)[indices[mask] - chunk * self.chunkFrames]
+        return result
+
+    def rows(self, begin, end):
+        end = min(end, self.frames)
+        if end <= begin:
+            return np.empty((0, self.channels), dtype=self.dtype)
+        first, last = begin // self.chunkFrames, (end - 1) // self.chunkFrames
+        if first == last:
+            base = first * self.chunkFrames
+            return self.chunk(first)[begin - base:end - base].copy()
+        parts = [self.chunk(k) for k in range(first, last + 1)]
+        base = first * self.chunkFrames
+        return np.concatenate(parts)[begin - base:end - base]
+
+    def chunk(self, k):
+        with self.lock:
+            data = self.chunkCache.get(k)
+            if data is not None:
+                self.chunkCache.move_to_end(k)
+                return data
+
+            self.indexUntil((k + 1) * self.chunkFrames)
+            if k >= len(self.chunkOffsets):
+                raise IndexError("frame " + str(k * self.chunkFrames) + " is beyond the end of " + self.filePath)
+            begin = self.chunkOffsets[k]
+            end = self.chunkOffsets[k + 1] if k + 1 < len(self.chunkOffsets) else self.size
+            values = np.array(self.mm[begin:end].split(), dtype=self.dtype)
+            data = values[:(len(values) // self.channels) * self.channels].reshape(-1, self.channels)
+            data = data[:self.chunkFrames]
+            data.setflags(write=False)
+
+            self.chunkCache[k] = data
+            while len(self.chunkCache) > self.cacheChunks:
+                self.chunkCache.popitem(last=False)
+            return data
+
+    # Scans newlines until at least "frame" lines (or the whole file) are indexed
+    def indexUntil(self, frame):
+        with self.lock:
+            while (self.indexedFrames <= frame) and (self.indexPos < self.size):
+                self.indexBlock()
+
+    # A frame is any line with a non-blank byte, whatever its leading whitespace; a
+    # line that runs past the block is finished by the next one
+    def indexBlock(self):
+        with self.lock:
+            begin = self.indexPos
+            end = min(begin + self.indexBlockBytes, self.size)
+            block = np.frombuffer(self.mm, dtype=np.uint8, count=end - begin, offset=begin)
+            newlines = np.flatnonzero(block == 10)
+            bounds = np.concatenate(([0], newlines + 1))
+            filled = np.concatenate(([0], np.cumsum(block > 32)))
+            fFilled = filled[np.append(newlines, len(block))] > filled[bounds]
+            fFilled[0] |= self.fLineFilled
+            lineStarts = begin + bounds
+            lineStarts[0] = self.lineStart
+            if end < self.size:     # the last line is not finished yet
+                self.lineStart, self.fLineFilled = int(lineStarts[-1]), bool(fFilled[-1])
+                lineStarts, fFilled = lineStarts[:-1], fFilled[:-1]
+            starts = lineStarts[fFilled]
+            lineIndex = self.indexedFrames + np.arange(len(starts))
+            self.chunkOffsets.extend(starts[lineIndex % self.chunkFrames == 0].tolist())
+            self.indexedFrames += len(starts)
+            self.indexPos = end
+            return end - begin
+
+    def close(self):
+        with self.lock:
+            self.chunkCache.clear()
+            if isinstance(self.mm, mmap.mmap):
+                self.mm.close()
+            self.fileHandle.close()
+
+
+def readHeader(filePath):
+    # Returns (header text up to and including "Frame Time", motion byte offset, frames, frameTime)
+    frames = None
+    frameTime = None
+    lines = []
+    with open(filePath, "rb") as f:
+        for line in f:
+            lines.append(line)
+            text = line.strip()
+            if text.startswith(b"Frames:"):
+                frames = int(text.split(b":")[1])
+            elif text.startswith(b"Frame Time:"):
+                frameTime = float(text.split(b":")[1])
+                break
+        motionOffset = f.tell() if frameTime is not None else None
+        firstFrame = f.readline() if frameTime is not None else b""
+        while (firstFrame != b"") and (firstFrame.strip() == b""):
+            firstFrame = f.readline()
+    if (frames is None) or (frameTime is None):
+        raise ValueError("MOTION section not found in " + filePath)
+    return b"".join(lines), motionOffset, frames, frameTime, firstFrame
+
+def readBVHStream(filePath):
+    header, motionOffset, frames, frameTime, firstFrame = readHeader(filePath)
+    channels = len(firstFrame.split())
+
+    # The hierarchy goes through python_bvh itself, so nodes are identical to the
+    # eager loader's; it only sees the header and a single frame.
+    hierarchy = header[:header.index(b"MOTION")] + b"MOTION\nFrames: 1\nFrame Time: " + str(frameTime).encode() + b"\n" + firstFrame
+    fd, tmpPath = tempfile.mkstemp(suffix=".bvh")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(hierarchy)
+        root = BVH.readBVH(tmpPath)[0]
+    finally:
+        os.remove(tmpPath)
+
+    motion = LazyMotion(filePath, motionOffset, frames, channels)
+    return root, motion, frames, frameTime
+
+# Picks the cheapest way to get at a file's motion: cache, streaming or a full parse
+def readMotion(filePath, motionCache=None, streamingThreshold=64 * 1024 * 1024):
+    if motionCache is not None:
+        cached = motionCache.load(filePath)
+        if cached is not None:
+            return cached
+    if os.path.getsize(filePath) >= streamingThreshold:
+        return readBVHStream(filePath)
+    return BVH.readBVH(filePath)
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Bulk BVH writer
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import numpy as np
+
+from python_bvh import BVHNode
+from Skeleton import compileSkeleton
+
+# HIERARCHY text is rendered once per skeleton and reused for every segment;
+# MOTION rows are formatted a block at a time by formatMotion.
+class BVHWriter:
+    precision = 6
+    blockFrames = 4096
+
+    def __init__(self, precision=None):
+        if precision is not None:
+            self.precision = precision
+        self.headers = {}   # id(root) -> (root, text); the root is kept so its id can't be reused
+
+    def hierarchy(self, root:BVHNode):
+        entry = self.headers.get(id(root))
+        if entry is None:
+            entry = (root, formatHierarchy(root))
+            self.headers[id(root)] = entry
+        return entry[1]
+
+    def write(self, dstFilePath, root:BVHNode, motion, frames, frameTime):
+        with open(dstFilePath, "wb") as f:
+            f.write(self.hierarchy(root).encode())
+            f.write(("MOTION\nFrames: " + str(frames) + "\nFrame Time: " + repr(float(frameTime)) + "\n").encode())
+            for begin in range(0, frames, self.blockFrames):
+                block = np.asarray(motion[begin:min(begin + self.blockFrames, frames)], dtype=np.float64)
+                f.write(formatMotion(block, self.precision))
+
+    # Binary segment: the same HIERARCHY text, raw motion and frame time in one .npz
+    def writeBinary(self, dstFilePath, root:BVHNode, motion, frames, frameTime):
+        with open(dstFilePath, "wb") as f:
+            np.savez(f, hierarchy=np.array(self.hierarchy(root)),
+                     motion=np.asarray(motion[0:frames], dtype=np.float64),
+                     frameTime=np.array(frameTime, dtype=np.float64))
+
+def readBinary(filePath):
+    with np.load(filePath) as data:
+        return str(data["hierarchy"]), data["motion"], float(data["frameTime"])
+
+# Fixed-point text for a (frames, channels) block, built digit by digit as a byte
+# matrix. Values are left-aligned in equal-width cells, so rows may end in spaces.
+# Halves round away from zero; %f rounds the exact binary value instead, so the
+# two can differ in the last digit when scaling lands a value on a half.
+def formatMotion(block, precision=6):
+    if len(block) == 0:
+        return b""
+    block = np.asarray(block, dtype=np.float64).reshape(len(block), -1)
+    rows, cols = block.shape
+    if block.size == 0:
+        return b"\n" * rows
+    scale = 10 ** precision
+    if not np.all(np.isfinite(block)) or (np.abs(block).max() * scale >= 2.0 ** 62):
+        rowFormat = " ".join(["%." + str(precision) + "f"] * cols) + "\n"
+        return ((rowFormat * rows) % tuple(block.ravel())).encode()
+
+    values = block.ravel()
+    scaled = np.floor(np.abs(values) * scale + 0.5).astype(np.int64)     # half away from zero
+    negative = np.signbit(values)   # like %f, -0.0 and negatives that round to zero keep "-"
+    intPart = scaled // scale
+    fracPart = scaled % scale
+    intDigits = len(str(int(intPart.max())))
+    numDigits = np.ones(len(values), dtype=np.int64)
+    for k in range(1, intDigits):
+        numDigits += intPart >= 10 ** k
+
+    cell = 1 + intDigits + (1 + precision if precision > 0 else 0) + 1
+    out = np.full((len(values), cell), ord(" "), dtype=np.uint8)
+    index = np.arange(len(values))
+    start = negative.astype(np.int64)
+    out[negative, 0] = ord("-")
+    for k in range(intDigits):
+        valid = np.flatnonzero(k < numDigits)
+        out[valid, (start + numDigits - 1 - k)[valid]] = ord("0") + (intPart[valid] // 10 ** k) % 10
+    if precision > 0:
+        point = start + numDigits
+        out[index, point] = ord(".")
+        for k in range(precision):
+            out[index, point + 1 + k] = ord("0") + (fracPart // 10 ** (precision - 1 - k)) % 10
+
+    out = out.reshape(rows, cols * cell)
+    out[:, -1] = ord("\n")
+    return out.tobytes()
+
+def formatHierarchy(root:BVHNode):
+    skeleton = compileSkeleton(root)
+    lines = ["HIERARCHY"]
+    openJoints = []
+
+    def close(joint):
+        indent = "\t" * skeleton.depth[joint]
+        site = skeleton.siteIndex[joint]
+        if site >= 0:
+            lines.append(indent + "\tEnd Site")
+            lines.append(indent + "\t{")
+            lines.append(indent + "\t\tOFFSET " + _formatVector(skeleton.siteOffsets[site]))
+            lines.append(indent + "\t}")
+        lines.append(indent + "}")
+
+    for joint in range(skeleton.numJoints):
+        while (len(openJoints) != 0) and (skeleton.depth[openJoints[-1]] >= skeleton.depth[joint]):
+            close(openJoints.pop())
+        indent = "\t" * skeleton.depth[joint]
+        channels = skeleton.jointChannels(joint)
+        lines.append(indent + ("ROOT " if joint == 0 else "JOINT ") + skeleton.names[joint])
+        lines.append(indent + "{")
+        lines.append(indent + "\tOFFSET " + _formatVector(skeleton.offsets[joint]))
+        lines.append(indent + "\tCHANNELS " + str(len(channels)) + " " + " ".join(channels))
+        openJoints.append(joint)
+    while len(openJoints) != 0:
+        close(openJoints.pop())
+    return "\n".join(lines) + "\n"
+
+
+## Support Functions
+def _formatVector(values):
+    return " ".join("%.6f" % v for v in values)
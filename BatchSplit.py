@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Headless batch splitter
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+# usage: python BatchSplit.py manifest.csv [-o OUTPUT_DIR] [-j JOBS]
+#
+# The manifest is CSV (with a header row) or JSON (a list of objects) with the
+# fields file, begin, end and optionally output and fps. Relative paths are resolved
+# against the manifest's directory; without output the GUI's naming is used, and
+# without fps the --fps option (or the source rate) applies.
+
+import os
+import sys
+import csv
+import json
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from BVHStream import readMotion
+from MotionCache import MotionCache
+from BVHWriter import BVHWriter
+from MotionSplit import splitFileName, exportSegment, fileFormats
+
+# Returns the segments and (row, message) for entries that could not be read
+def readManifest(manifestPath):
+    with open(manifestPath, newline="") as f:
+        if manifestPath.lower().endswith(".json"):
+            entries = json.load(f)
+        else:
+            entries = list(csv.DictReader(f))
+
+    baseDir = os.path.dirname(os.path.abspath(manifestPath))
+    segments, errors = [], []
+    for row, entry in enumerate(entries):
+        try:
+            if not isinstance(entry, dict):
+                raise ValueError("entry is not an object")
+            missing = [field for field in ("file", "begin", "end") if entry.get(field) in (None, "")]
+            if len(missing) != 0:
+                raise ValueError("missing " + ", ".join(missing))
+            filePath = os.path.join(baseDir, str(entry["file"]))
+            output = entry.get("output") or None
+            fps = float(entry["fps"]) if entry.get("fps") not in (None, "") else None
+            segments.append((filePath, int(entry["begin"]), int(entry["end"]), output, row, fps))
+        except (ValueError, TypeError) as e:
+            errors.append((row, str(e)))
+    return segments, errors
+
+# One task per (file, group of segments): the hierarchy is parsed once per task
+def planTasks(segments, jobs):
+    byFile = OrderedDict()
+    for segment in segments:
+        byFile.setdefault(segment[0], []).append(segment)
+    groupsPerFile = max(1, jobs // max(1, len(byFile)))
+    tasks = []
+    for filePath, fileSegments in byFile.items():
+        groups = min(groupsPerFile, len(fileSegments))
+        for i in range(groups):
+            tasks.append((filePath, fileSegments[i::groups]))
+    return tasks
+
+def splitTask(filePath, segments, outputDir, useCache, fileFormat="bvh", precision=6, fps=None):
+    root, motion, frames, frameTime = readMotion(filePath, MotionCache() if useCache else None)
+    writer = BVHWriter(precision)
+    results = []
+    for _, begin, end, output, row, rowFps in segments:
+        dstFilePath = os.path.join(outputDir, output or splitFileName(os.path.basename(filePath), row, fileFormat))
+        targetFps = rowFps if rowFps is not None else fps
+        try:
+            if (targetFps is not None) and (targetFps <= 0):
+                raise ValueError("invalid frame rate " + str(targetFps))
+            exportSegment(dstFilePath, root, motion, begin, end, frameTime, writer, fileFormat,
+                          None if targetFps is None else 1.0 / targetFps)
+            results.append((dstFilePath, None))
+        except (ValueError, OSError, ImportError) as e:
+            results.append((dstFilePath, str(e)))
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Split BVH files into segments listed in a manifest.")
+    parser.add_argument("manifest", help="CSV or JSON manifest of file, begin, end[, output]")
+    parser.add_argument("-o", "--output-dir", default=".", help="destination folder (default: current folder)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("-f", "--format", choices=sorted(fileFormats), default="bvh", help="output format (default: bvh)")
+    parser.add_argument("-p", "--precision", type=int, default=6, help="decimal places written to BVH (default: 6)")
+    parser.add_argument("--fps", type=float, default=None, help="resample segments to this frame rate (default: keep the source rate)")
+    parser.add_argument("--no-cache", action="store_true", help="do not read the parse cache")
+    args = parser.parse_args(argv)
+
+    segments, errors = readManifest(args.manifest)
+    os.makedirs(args.output_dir, exist_ok=True)
+    tasks = planTasks(segments, args.jobs)
+
+    failures = len(errors)
+    for row, error in errors:
+        print("Error: " + args.manifest + " row " + str(row) + ": " + error, file=sys.stderr)
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = {executor.submit(splitTask, filePath, group, args.output_dir, not args.no_cache, args.format, args.precision,
+                                   args.fps): filePath
+                   for filePath, group in tasks}
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                results = [(futures[future], str(e))]
+            for dstFilePath, error in results:
+                if error is None:
+                    print(dstFilePath)
+                else:
+                    failures += 1
+                    print("Error: " + dstFilePath + ": " + error, file=sys.stderr)
+    return 1 if failures != 0 else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
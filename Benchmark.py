@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Loading / pose evaluation / drawing benchmarks
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+# usage: python Benchmark.py [-j 20 100 300] [-n 10000] [-l ZXY] [--gl qt] [-o result.json]
+#
+# Synthetic BVH files are generated into a temporary folder for every joint count.
+# Drawing runs on an offscreen context: "qt" uses QOffscreenSurface plus a
+# framebuffer object (QT_QPA_PLATFORM=offscreen for no display), "osmesa" uses
+# PyOpenGL's OSMesa binding (software Mesa), "none" skips the drawing cases.
+# The result is printed (or written with -o) as JSON.
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import platform
+import subprocess
+import tracemalloc
+import numpy as np
+
+from BVHWriter import formatMotion
+
+layouts = ("ZXY", "XYZ", "mixed", "full")
+
+def generateBVH(filePath, joints, frames, layout="ZXY", seed=0):
+    rng = np.random.default_rng(seed)
+    parents = [-1] + [int(rng.integers(max(0, i - 4), i)) for i in range(1, joints)]
+    children = [[] for _ in range(joints)]
+    for i in range(1, joints):
+        children[parents[i]].append(i)
+
+    channels = 0
+    lines = ["HIERARCHY"]
+    stack = [(0, 0, False)]
+    while len(stack) != 0:
+        joint, depth, fClose = stack.pop()
+        indent = "\t" * depth
+        if fClose:
+            if len(children[joint]) == 0:
+                lines += [indent + "\tEnd Site", indent + "\t{", indent + "\t\tOFFSET 0.000000 5.000000 0.000000", indent + "\t}"]
+            lines.append(indent + "}")
+            continue
+        order = "".join(rng.permutation(list("XYZ"))) if layout in ("mixed", "full") else layout
+        labels = [axis + "rotation" for axis in order]
+        if (joint == 0) or (layout == "full"):
+            labels = ["Xposition", "Yposition", "Zposition"] + labels
+        channels += len(labels)
+        offset = rng.uniform(-10.0, 10.0, 3)
+        lines.append(indent + ("ROOT" if joint == 0 else "JOINT") + " joint" + str(joint))
+        lines.append(indent + "{")
+        lines.append(indent + "\tOFFSET " + " ".join("%.6f" % v for v in offset))
+        lines.append(indent + "\tCHANNELS " + str(len(labels)) + " " + " ".join(labels))
+        stack.append((joint, depth, True))
+        for child in reversed(children[joint]):
+            stack.append((child, depth + 1, False))
+
+    with open(filePath, "wb") as f:
+        f.write(("\n".join(lines) + "\nMOTION\nFrames: " + str(frames) + "\nFrame Time: 0.008333\n").encode())
+        state = rng.uniform(-30.0, 30.0, channels)
+        for begin in range(0, frames, 4096):
+            steps = rng.normal(0.0, 0.5, (min(4096, frames - begin), channels))
+            block = state + np.cumsum(steps, axis=0)
+            state = block[-1]
+            f.write(formatMotion(block))
+    return channels
+
+def measure(func, repeat=1):
+    times = []
+    result = None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - begin)
+    return min(times), result
+
+# Timed and traced in separate runs; tracemalloc slows allocation-heavy code a lot
+def measurePeak(func):
+    seconds, result = measure(func)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return seconds, peak / (1024.0 * 1024.0), result
+
+def benchLoad(filePath, cacheDir):
+    from python_bvh import BVH
+    from BVHStream import readBVHStream
+    from MotionCache import MotionCache
+
+    results = {"file_mb": os.path.getsize(filePath) / (1024.0 * 1024.0)}
+    results["parse_s"], results["parse_peak_mb"], loaded = measurePeak(lambda: BVH.readBVH(filePath))
+
+    def streamFirstFrame():
+        root, motion, frames, frameTime = readBVHStream(filePath)
+        motion[0]
+        motion.close()
+    results["stream_first_frame_s"], results["stream_first_frame_peak_mb"], _ = measurePeak(streamFirstFrame)
+
+    cache = MotionCache(cacheDir)
+    results["cache_store_s"] = measure(lambda: cache.store(filePath, *loaded))[0]
+    results["cache_load_s"], results["cache_load_peak_mb"], _ = measurePeak(lambda: cache.load(filePath))
+    return loaded, results
+
+def benchPose(root, motion, samples):
+    from Kinematics import ForwardKinematics, PoseTrack
+
+    results = {}
+    kinematics = ForwardKinematics(root)
+    results["joints"] = kinematics.numJoints
+    seconds, results["fk_all_frames_peak_mb"], positions = measurePeak(lambda: kinematics.jointPositions(motion))
+    results["fk_all_frames_s"] = seconds
+    results["fk_per_frame_us"] = 1e6 * seconds / len(motion)
+
+    results["pose_track_build_s"], track = measure(lambda: PoseTrack(kinematics, motion))
+    times = np.linspace(0.0, len(motion) - 1.0, samples) + 0.37
+    seconds = measure(lambda: [track.positionsAt(t) for t in times])[0]
+    results["interpolated_pose_us"] = 1e6 * seconds / samples
+
+    lazyTrack = PoseTrack(kinematics, motion, precompute=False)
+    seconds = measure(lambda: [lazyTrack.positionsAt(t) for t in times])[0]
+    results["on_demand_pose_us"] = 1e6 * seconds / samples
+    return kinematics, positions, results
+
+def benchDraw(kinematics, positions, backend, width, height, drawFrames):
+    from OpenGL.GL import glViewport, glClear, glFinish, glMatrixMode, glLoadIdentity, glEnable, glGetString
+    from OpenGL.GL import GL_COLOR_BUFFER_BIT, GL_DEPTH_BUFFER_BIT, GL_PROJECTION, GL_MODELVIEW, GL_DEPTH_TEST, GL_RENDERER
+    from OpenGL.GLU import gluPerspective, gluLookAt
+    from SkeletonRenderer import SkeletonRenderer
+    from Render import createContext
+
+    contextRefs = createContext(backend, width, height)
+    renderer = SkeletonRenderer()
+    renderer.initialize()
+    glViewport(0, 0, width, height)
+    glEnable(GL_DEPTH_TEST)
+    bones = kinematics.bones
+    frames = np.linspace(0, len(positions) - 1, drawFrames).astype(np.int64)
+
+    def drawAll():
+        for frame in frames:
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+            glMatrixMode(GL_PROJECTION)
+            glLoadIdentity()
+            gluPerspective(60.0, float(width) / float(height), 1.0, 1000.0)
+            gluLookAt(500.0, 120.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+            glMatrixMode(GL_MODELVIEW)
+            pose = positions[frame]
+            renderer.draw(pose[bones[:, 0]], pose[bones[:, 1]], pose[:kinematics.numJoints], (1.0, 0.549, 0.0), (1.0, 0.271, 0.0))
+        glFinish()
+
+    results = {"renderer": glGetString(GL_RENDERER).decode(errors="replace"), "instancing_available": renderer.isAvailable}
+    for name, fInstancing in (("immediate", False), ("instanced", True)):
+        if fInstancing and not renderer.isAvailable:
+            continue
+        renderer.useInstancing = fInstancing
+        drawAll()     # warm-up
+        results[name + "_draw_ms"] = 1e3 * measure(drawAll)[0] / drawFrames
+    del contextRefs
+    return results
+
+def environment():
+    try:
+        revision = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                           stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {"revision": revision, "python": platform.python_version(), "numpy": np.__version__,
+            "platform": platform.platform(), "processor": platform.processor()}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark BVH loading, pose evaluation and drawing.")
+    parser.add_argument("-j", "--joints", type=int, nargs="+", default=[20, 100, 300], help="joint counts to generate")
+    parser.add_argument("-n", "--frames", type=int, default=10000, help="frames per generated file")
+    parser.add_argument("-l", "--layout", choices=layouts, default="ZXY", help="channel layout of generated joints")
+    parser.add_argument("--gl", choices=("qt", "osmesa", "none"), default="qt", help="offscreen GL backend for drawing")
+    parser.add_argument("--size", type=int, nargs=2, default=[640, 480], metavar=("W", "H"), help="offscreen framebuffer size")
+    parser.add_argument("--draw-frames", type=int, default=200, help="frames drawn per drawing case")
+    parser.add_argument("--samples", type=int, default=1000, help="poses sampled for per-pose timings")
+    parser.add_argument("-o", "--output", help="write the JSON result here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.gl == "osmesa":
+        os.environ["PYOPENGL_PLATFORM"] = "osmesa"    # must be set before OpenGL is imported
+
+    workDir = tempfile.mkdtemp(prefix="bvhbench")
+    cases = []
+    try:
+        for joints in args.joints:
+            filePath = os.path.join(workDir, "synthetic_" + str(joints) + ".bvh")
+            config = {"joints": joints, "frames": args.frames, "layout": args.layout}
+            config["channels"] = generateBVH(filePath, joints, args.frames, args.layout)
+
+            (root, motion, frames, frameTime), load = benchLoad(filePath, os.path.join(workDir, "cache"))
+            kinematics, positions, pose = benchPose(root, motion, args.samples)
+            case = {"config": config, "load": load, "pose": pose}
+            if args.gl != "none":
+                try:
+                    case["draw"] = benchDraw(kinematics, positions, args.gl, args.size[0], args.size[1], args.draw_frames)
+                except Exception as e:
+                    case["draw"] = {"error": str(e)}
+            cases.append(case)
+            os.remove(filePath)
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+    result = json.dumps({"benchmark": "BVHPlayerPy", "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                         "environment": environment(), "cases": cases}, indent=2)
+    if args.output is None:
+        print(result)
+    else:
+        with open(args.output, "w") as f:
+            f.write(result + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Take-to-take comparison
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import numpy as np
+
+from Kinematics import ForwardKinematics, matrixToQuaternion
+
+# Errors of take B against take A, per frame of A. matches[i] is the frame of B
+# compared with frame i of A (the DTW alignment, or i itself clipped to B).
+class TakeComparison:
+    def __init__(self, positionError, rotationError, matches, path=None):
+        self.positionError = positionError      # (frames, points) distance
+        self.rotationError = rotationError      # (frames, joints) degrees between world rotations
+        self.matches = matches
+        self.path = path                        # (steps, 2) warping path, None when unaligned
+        self.frameError = positionError.mean(axis=1)
+
+def compareTakes(kinematicsA:ForwardKinematics, motionA, kinematicsB:ForwardKinematics, motionB, fAlign=False, band=None,
+                 chunkFrames=4096, isCancelled=None):
+    if kinematicsA.topologyKey != kinematicsB.topologyKey:
+        raise ValueError("the takes do not share a hierarchy")
+    pointsA, rotationsA = _worldPoses(kinematicsA, motionA, chunkFrames, isCancelled)
+    pointsB, rotationsB = _worldPoses(kinematicsB, motionB, chunkFrames, isCancelled)
+
+    path = None
+    if fAlign:
+        joints = kinematicsA.numJoints
+        path = alignFrames(_features(pointsA[:, :joints]), _features(pointsB[:, :joints]), band, isCancelled)
+        matches = np.full(len(pointsA), len(pointsB) - 1, dtype=np.int64)
+        np.minimum.at(matches, path[:, 0], path[:, 1])
+    else:
+        matches = np.minimum(np.arange(len(pointsA)), len(pointsB) - 1)
+
+    positionError = np.linalg.norm(pointsA - pointsB[matches], axis=2)
+    dot = np.abs(np.sum(rotationsA * rotationsB[matches], axis=2))
+    rotationError = np.degrees(2.0 * np.arccos(np.clip(dot, 0.0, 1.0))).astype(np.float32)
+    return TakeComparison(positionError, rotationError, matches, path)
+
+# Dynamic time warping restricted to |j - i * (m-1)/(n-1)| <= band. Each row of the
+# cost table is one vectorized step: the diagonal / vertical moves are elementwise,
+# the horizontal chain is a cumulative minimum over prefix sums of the row cost.
+def alignFrames(featuresA, featuresB, band=None, isCancelled=None, blockRows=256):
+    n, m = len(featuresA), len(featuresB)
+    if band is None:
+        band = max(32, max(n, m) // 200)
+    # the band's center moves by up to max(n, m) / min(n, m) columns per row; a narrower
+    # band would leave consecutive rows without a connecting move
+    band = max(band, -(-max(n, m) // max(1, min(n, m))))
+    width = 2 * band + 1
+    centers = np.rint(np.arange(n) * ((m - 1) / max(1, n - 1))).astype(np.int64)
+    lows = np.clip(centers - band, 0, max(0, m - width))
+    offsets = np.arange(width)
+    normsB = np.einsum("ij,ij->i", featuresB, featuresB)
+
+    moves = np.zeros((n, width), dtype=np.int8)     # 0: diagonal, 1: from the row above, 2: from the left
+    previous = None
+    for first in range(0, n, blockRows):
+        if (isCancelled is not None) and isCancelled():
+            raise InterruptedError
+        last = min(first + blockRows, n)
+        # Squared distances of the block's rows to their band, through one matrix product
+        lo, hi = lows[first], min(m, lows[last - 1] + width)
+        block = featuresB[lo:hi]
+        distances = (np.einsum("ij,ij->i", featuresA[first:last], featuresA[first:last])[:, None] + normsB[None, lo:hi]
+                     - 2.0 * (featuresA[first:last] @ block.T))
+        columns = lows[first:last, None] + offsets[None, :]
+        valid = columns < m
+        rowCosts = np.sqrt(np.maximum(distances[np.arange(last - first)[:, None], np.minimum(columns, hi - 1) - lo], 0.0))
+        rowCosts[~valid] = np.inf
+
+        for r in range(last - first):
+            i = first + r
+            cost = rowCosts[r]
+            if previous is None:
+                current = np.cumsum(cost)
+                moves[i, 1:] = 2
+            else:
+                shift = lows[i] - lows[i - 1]     # previous row index of column lows[i] + k is k + shift
+                up = _shifted(previous, shift)
+                diagonal = _shifted(previous, shift - 1)
+                fromAbove = up < diagonal
+                arrive = cost + np.where(fromAbove, up, diagonal)
+                prefix = np.cumsum(np.where(np.isfinite(cost), cost, 0.0))
+                start = arrive - prefix
+                best = np.minimum.accumulate(start)
+                current = best + prefix
+                current[~np.isfinite(cost)] = np.inf
+                moves[i] = np.where(start > best, 2, fromAbove.astype(np.int8))
+            previous = current
+
+    # Walk back from the last frame pair
+    path = []
+    i, k = n - 1, (m - 1) - lows[n - 1]
+    while True:
+        path.append((i, lows[i] + k))
+        if (i == 0) and (k == 0):
+            break
+        move = moves[i, k]
+        if (move == 2) or (i == 0):
+            k -= 1
+        else:
+            k += lows[i] - lows[i - 1] - (0 if move == 1 else 1)
+            i -= 1
+    return np.array(path[::-1], dtype=np.int64)
+
+
+## Support Functions
+def _worldPoses(kinematics, motion, chunkFrames, isCancelled):
+    frames = len(motion)
+    points = np.empty((frames, kinematics.numPoints, 3), dtype=np.float32)
+    rotations = np.empty((frames, kinematics.numJoints, 4), dtype=np.float32)
+    for begin in range(0, frames, chunkFrames):
+        if (isCancelled is not None) and isCancelled():
+            raise InterruptedError
+        end = min(begin + chunkFrames, frames)
+        chunkPoints, chunkRotation = kinematics.worldPoses(motion[begin:end])
+        points[begin:end] = chunkPoints
+        rotations[begin:end] = matrixToQuaternion(chunkRotation)
+    return points, rotations
+
+def _features(points):
+    # Joint positions relative to the root, so a global offset between takes doesn't dominate
+    return (points - points[:, :1]).reshape(len(points), -1).astype(np.float64)
+
+def _shifted(row, shift):
+    # row re-indexed so that result[k] = row[k + shift], inf outside
+    result = np.full(len(row), np.inf)
+    if shift >= 0:
+        if shift < len(row):
+            result[:len(row) - shift] = row[shift:]
+    elif -shift < len(row):
+        result[-shift:] = row[:len(row) + shift]
+    return result
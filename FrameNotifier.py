@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Rate-limited frame notifications
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import time
+from PyQt5.Qt import *
+
+# Coalesces frame changes from the render loop: subscribers get the latest frame
+# at most maxRate times per second, only when it changed, and always the last one.
+class FrameNotifier(QObject):
+    frameChanged = pyqtSignal(int)
+    maxRate = 30.0
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pending = None
+        self.lastFrame = None
+        self.lastTime = None
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+    def reset(self):
+        self.timer.stop()
+        self.pending = None
+        self.lastFrame = None
+
+    def post(self, frame):
+        self.pending = frame
+        if self.timer.isActive():
+            return
+        wait = 0.0 if self.lastTime is None else self.lastTime + 1.0 / self.maxRate - time.perf_counter()
+        if wait <= 0.0:
+            self.flush()
+        else:
+            self.timer.start(int(wait * 1000.0) + 1)
+
+    def flush(self):
+        if self.pending is None:
+            return
+        frame, self.pending = self.pending, None
+        if frame == self.lastFrame:
+            return
+        self.lastFrame = frame
+        self.lastTime = time.perf_counter()
+        self.frameChanged.emit(frame)
@@ -2,19 +2,25 @@
 
 # "BVHPlayerPy" OpenGL drawing component
 # Author: T.Shuhei
-# Last Modified: 2017/09/28
+# Last Modified: 2026/10/18
 
 import numpy as np
-import time
 
 from PyQt5.Qt import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
 
 from python_bvh import BVHNode
+from Actor import Actor, scenePoses, palette
+from SkeletonRenderer import SkeletonRenderer
+from PlaybackClock import PlaybackClock
+from PoseCache import PoseCache
+from Profiler import FrameProfiler
+from FrameNotifier import FrameNotifier
+from Trails import TrailBuffer
 
 class GLWidget(QOpenGLWidget):
-    frameChanged = pyqtSignal(int)
+    frameChanged = pyqtSignal(int)     # throttled to FrameNotifier.maxRate; read frameCount for the exact frame
     hParentWidget = None
     checkerBoardSize = 50
     camDist = 500
@@ -23,21 +29,94 @@ class GLWidget(QOpenGLWidget):
     rotateY = 45
     translateX = 0
     translateY = 0
-    frameCount = 0
-    isPlaying = True
     fastRatio = 1.0
     scale = 1.0
     root = None
     motion = None
     frames = None
     frameTime = None
+    kinematics = None
+    positions = None
+    poseTrack = None
+    precomputeBytes = 256 * 1024 * 1024    # budget shared by all actors; the rest (and streamed motions) is evaluated on demand
+    actorSpacing = 100.0    # default X offset between added actors
+    interpolate = True    # slerp between frames for slow motion / display-rate resampling
+    skeletonRenderer = None
     drawMode = 0    # 0:rotation, 1:position
+    ghostOffsets = ()   # frame offsets of the primary actor's onion-skin ghosts
+    ghostOpacity = 0.5  # blend of the nearest ghost's color over the background; farther ones fade more
+    backgroundColor = (0.2, 0.2, 0.2)
+    fTrails = False
+    trailJoints = None  # joint names to trace; None traces every end site
+    displayInterval = 16    # msec, refined from the screen refresh rate
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.hParentWidget = parent
         self.setMinimumSize(500, 500)
         self.lastPos = QPoint()
+        self._frameCount = 0
+        self._isPlaying = False
+        self.actors = []    # actors[0] is the motion set by setMotion and drives the clock
+        self.clock = PlaybackClock()
+        self.poseCache = PoseCache()    # poses of actors evaluated on demand, for scrubbing back and forth
+        self.direction = 1      # last playback / stepping direction, for prefetching
+        self.playTimer = QTimer(self)
+        self.playTimer.setTimerType(Qt.PreciseTimer)
+        self.playTimer.timeout.connect(self.updateFrame)
+        screen = QGuiApplication.primaryScreen()
+        if (screen is not None) and (screen.refreshRate() > 0):
+            self.displayInterval = max(1, int(1000.0 / screen.refreshRate()))
+        self.profiler = FrameProfiler()
+        self.profiler.expectedInterval = self.displayInterval / 1000.0
+        self.frameSwapped.connect(self.profiler.swapped)
+        self.frameNotifier = FrameNotifier(self)
+        self.frameNotifier.frameChanged.connect(self.emitFrame)
+        self.trails = TrailBuffer()
+
+    # Every writer (keys, control buttons, splitter) goes through these,
+    # so the clock stays in sync and a paused view is repainted on demand
+    @property
+    def frameCount(self):
+        return self._frameCount
+
+    @frameCount.setter
+    def frameCount(self, frame):
+        if frame != self._frameCount:
+            self.direction = 1 if frame > self._frameCount else -1
+        if self.frames:
+            frame = int(frame) % self.availableFrames()
+        self._frameCount = frame
+        self.clock.reset(frame)
+        if self._isPlaying:
+            self.clock.start()
+        self.notifyFrame()
+        self.update()
+
+    # Jumps to a frame without wrapping; a streamed motion's frames past the indexed
+    # part clamp to the last indexed one
+    def seek(self, frame):
+        if self.frames:
+            frame = min(max(0, int(frame)), self.availableFrames() - 1)
+        self.frameCount = frame
+
+    @property
+    def isPlaying(self):
+        return self._isPlaying
+
+    @isPlaying.setter
+    def isPlaying(self, fPlay):
+        self._isPlaying = fPlay
+        if fPlay and (self.frames is not None):
+            self.clock.start()
+            self.playTimer.start(self.tickInterval())
+        else:
+            self.clock.stop()
+            self.playTimer.stop()
+
+    # Frames of the primary actor that can be shown now
+    def availableFrames(self):
+        return self.actors[0].availableFrames()
 
     def resetCamera(self):
         self.rotateXZ = 0
@@ -45,42 +124,129 @@ class GLWidget(QOpenGLWidget):
         self.translateX = 0
         self.translateY = 0
         self.camDist = 500
+        self.update()
 
-    def setMotion(self, root:BVHNode, motion, frames:int, frameTime:float):
+    def setMotion(self, root:BVHNode, motion, frames:int, frameTime:float, name=""):
         self.root = root
         self.motion = motion
         self.frames = frames
         self.frameTime = frameTime
+        for previous in self.actors:
+            previous.cancelPrecompute()
+        actor = Actor(name, root, motion, frames, frameTime, precomputeBytes=self.precomputeBytes, interpolate=self.interpolate)
+        self.poseCache.clear()
+        self.frameNotifier.reset()
+        self.actors = [actor]
+        self.kinematics = actor.kinematics
+        self.positions = actor.positions
+        self.poseTrack = actor.poseTrack
+        self.trails.setSource(None, ())
         self.frameCount = 0
         self.isPlaying = True
 
+    # Adds a performer on the shared clock; the first one becomes the primary motion
+    def addActor(self, root:BVHNode, motion, frames:int, frameTime:float, name="", offset=None, color=None, timeOffset=0.0):
+        if len(self.actors) == 0:
+            self.setMotion(root, motion, frames, frameTime, name)
+            return self.actors[0]
+        if offset is None:
+            offset = (self.actorSpacing * len(self.actors), 0.0, 0.0)
+        if color is None:
+            color = palette[(len(self.actors) - 1) % len(palette)]
+        precomputed = sum(actor.precomputedBytes for actor in self.actors)
+        actor = Actor(name, root, motion, frames, frameTime, offset, color, timeOffset,
+                      precomputeBytes=self.precomputeBytes - precomputed, interpolate=self.interpolate)
+        self.actors.append(actor)
+        self.update()
+        return actor
+
     def initializeGL(self):
         glEnable(GL_DEPTH_TEST)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_CONSTANT_ALPHA)
         glEnable(GL_BLEND)
-        glClearColor(0.2, 0.2, 0.2, 0)
+        glClearColor(*self.backgroundColor, 0)
         self.floorObj = self.makeFloorObject(0)
-        self.start = time.time()
+        self.skeletonRenderer = SkeletonRenderer()
+        self.skeletonRenderer.initialize()
+
+    def tickInterval(self):
+        # No faster than the display, no slower than the motion needs
+        if (self.frameTime is None) or (self.fastRatio == 0) or self.interpolate:
+            return self.displayInterval
+        return max(self.displayInterval, int(1000.0 * self.frameTime / abs(self.fastRatio)))
 
     def updateFrame(self):
-        if (self.frames is not None) and (self.frameTime is not None):
-            now = time.time()
-            if self.isPlaying:
-                self.frameCount += int(1 * self.fastRatio) if abs(self.fastRatio) >= 1.0 else 1
-                if self.frameCount >= self.frames:
-                    self.frameCount = 0
-                elif self.frameCount < 0:
-                    self.frameCount = self.frames - 1
-                self.frameChanged.emit(self.frameCount)
-        self.update()
-        self.hParentWidget.infoPanel.updateFrameCount(self.frameCount)
+        if (self.frames is None) or (self.frameTime is None) or not self.isPlaying:
+            return
+        with self.profiler.stage("update"):
+            self.clock.advance(self.frameTime, self.fastRatio)
+            self.direction = 1 if self.fastRatio >= 0 else -1
+            frame = int(np.floor(self.clock.wrap(self.availableFrames())))
+            self.playTimer.setInterval(self.tickInterval())
+        if frame != self._frameCount:
+            self._frameCount = frame
+            self.notifyFrame()
+            self.update()
+        elif self.interpolate:
+            self.update()
+
+    # The render loop only posts; labels and other subscribers run at the notifier's rate
+    def notifyFrame(self):
+        self.frameNotifier.post(self._frameCount)
+
+    def emitFrame(self, frame):
+        with self.profiler.stage("labels"):
+            self.frameChanged.emit(frame)
 
     def paintGL(self):
+        self.profiler.frame()
+        qs = self.sizeHint()
+        self.drawScene(float(qs.width()) / float(qs.height()))
+        if self.profiler.enabled:
+            self.drawOverlay()
+        self.profiler.painted()
+
+    def setGhostOffsets(self, offsets):
+        self.ghostOffsets = tuple(int(offset) for offset in offsets if offset != 0)
+        self.update()
+
+    def setTrails(self, fEnable):
+        self.fTrails = fEnable
+        self.update()
+
+    def setTrailJoints(self, names):
+        self.trailJoints = names
+        self.update()
+
+    # Pose indices traced for an actor: the named joints, or its end sites
+    def trailPoints(self, actor):
+        skeleton = actor.kinematics.skeleton
+        if self.trailJoints is None:
+            return skeleton.numJoints + np.arange(len(skeleton.siteJoints))
+        return [skeleton.names.index(name) for name in self.trailJoints if name in skeleton.names]
+
+    def setProfiling(self, fEnable):
+        self.profiler.setEnabled(fEnable)
+        self.update()
+
+    # Frame time statistics over the scene; QPainter leaves its own GL state behind
+    def drawOverlay(self):
+        painter = QPainter(self)
+        painter.setPen(QColor(255, 255, 255))
+        painter.setFont(QFont("Monospace", 8))
+        for i, line in enumerate(self.profiler.overlayLines()):
+            painter.drawText(8, 16 + 14 * i, line)
+        painter.end()
+        glEnable(GL_DEPTH_TEST)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_CONSTANT_ALPHA)
+        glEnable(GL_BLEND)
+
+    # Whole scene into the current framebuffer; also used by the offscreen renderer
+    def drawScene(self, aspect, position=None):
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glMatrixMode(GL_PROJECTION)
         glLoadIdentity()
-        qs = self.sizeHint()
-        gluPerspective(60.0, float(qs.width()) / float(qs.height()), 1.0, 1000.0)
+        gluPerspective(60.0, aspect, 1.0, 1000.0)
         camPx = self.camDist * np.cos(self.rotateXZ / 180.0)
         camPy = self.camDist * np.tanh(self.rotateY / 180.0)
         camPz = self.camDist * np.sin(self.rotateXZ / 180.0)
@@ -90,114 +256,66 @@ class GLWidget(QOpenGLWidget):
         glMatrixMode(GL_MODELVIEW)
         glPushMatrix()
         glCallList(self.floorObj)
-        self.drawSkeleton()
+        self.drawSkeleton(position)
+        glPopMatrix()
+        with self.profiler.stage("flush"):
+            glFlush()
+
+    def drawSkeleton(self, position=None):
+        if len(self.actors) == 0:
+            return
+        # The primary actor's frame position is the clock; the others follow in seconds
+        if position is None:
+            position = self.clock.position if self.interpolate else self.frameCount
+        seconds = position * self.frameTime
+        positions = [position] + [actor.followPosition(position, seconds) for actor in self.actors[1:]]
+        # Ghosts are more poses of the primary actor, evaluated and drawn in the same batches
+        primary = self.actors[0]
+        ghostOffsets = [offset for offset in self.ghostOffsets if 0 <= position + offset < primary.availableFrames()]
+        with self.profiler.stage("pose"):
+            poses = scenePoses(self.actors + [primary] * len(ghostOffsets), positions + [position + offset for offset in ghostOffsets],
+                               self.interpolate, self.poseCache)
+        # The cache only serves whole frames, so interpolated playback does not prefetch;
+        # stepping, scrubbing and whole-frame playback do
+        fPrefetch = (not self.interpolate) or not self.isPlaying
+        for actor, actorPosition in zip(self.actors, positions):
+            if fPrefetch and (actor.precomputedBytes == 0):
+                self.poseCache.prefetch(actor, int(actorPosition) % actor.availableFrames(), self.direction)
+
+        if self.drawMode == 0:  # rotation mode
+            modeColor = ((1.000, 0.549, 0.000), (1.000, 0.271, 0.000))
+        else:                   # position mode
+            modeColor = ((0.000, 1.000, 0.000), (0.000, 1.052, 0.000))
+
+        colors = [modeColor if actor.color is None else actor.color for actor in self.actors]
+        farthest = max([abs(offset) for offset in ghostOffsets], default=1)
+        for offset in ghostOffsets:
+            weight = self.ghostOpacity * (1.0 - 0.5 * abs(offset) / farthest)
+            colors.append(tuple(weight * np.array(color) + (1.0 - weight) * np.array(self.backgroundColor) for color in colors[0]))
+
+        # All actors and ghosts go out in one bone batch and one joint batch
+        boneBegin, boneEnd, joints, boneColors, jointColors = [], [], [], [], []
+        for actor, pose, (boneColor, jointColor) in zip(self.actors + [primary] * len(ghostOffsets), poses, colors):
+            pose = pose * self.scale
+            bones = actor.kinematics.bones
+            boneBegin.append(pose[bones[:, 0]])
+            boneEnd.append(pose[bones[:, 1]])
+            joints.append(pose[:actor.kinematics.numJoints])
+            boneColors.append(np.tile(boneColor, (len(bones), 1)))
+            jointColors.append(np.tile(jointColor, (actor.kinematics.numJoints, 1)))
+        with self.profiler.stage("draw"):
+            self.skeletonRenderer.draw(np.concatenate(boneBegin), np.concatenate(boneEnd), np.concatenate(joints),
+                                       np.concatenate(boneColors), np.concatenate(jointColors))
+            if self.fTrails:
+                self.drawTrails(primary, int(position))
+
+    def drawTrails(self, actor, frame):
+        self.trails.setSource(actor, self.trailPoints(actor))
+        self.trails.update(frame)
+        glPushMatrix()
+        glScaled(self.scale, self.scale, self.scale)
+        self.trails.draw(frame)
         glPopMatrix()
-        glFlush()
-#        self.update()
-        self.updateFrame()
-
-    def drawSkeleton(self):
-        def _RenderBone(quadObj, x0, y0, z0, x1, y1, z1):
-            dir = [x1 - x0, y1 - y0, z1 - z0]
-            boneLength = np.sqrt(dir[0]**2 + dir[1]**2 + dir[2]**2)
-
-            if quadObj is None:
-                quadObj = GLUQuadric()
-            gluQuadricDrawStyle(quadObj, GLU_FILL)
-            gluQuadricNormals(quadObj, GLU_SMOOTH)
-
-            glPushMatrix()
-            glTranslated(x0, y0, z0)
-
-            length = np.sqrt(dir[0]**2 + dir[1]**2 + dir[2]**2)
-            if length < 0.0001:
-                dir = [0.0, 0.0, 1.0]
-                length = 1.0
-            dir = [data / length for data in dir]            
-            
-#            up   = [0.0, 1.0, 0.0]
-#            side = [up[1]*dir[2] - up[2]*dir[1], up[2]*dir[0] - up[0]*dir[2], up[0]*dir[1] - up[1]*dir[0]]
-            side = [dir[2], 0.0, -dir[0]]
-            length = np.sqrt(side[0]**2 + side[1]**2 + side[2]**2)
-            if length < 0.0001:
-                side = [1.0, 0.0, 0.0]
-                length = 1.0
-            side = [data / length for data in side]
-
-            up = [dir[1]*side[2] - dir[2]*side[1], dir[2]*side[0] - dir[0]*side[2], dir[0]*side[1] - dir[1]*side[0]]
-            glMultMatrixd((side[0], side[1], side[2], 0.0,
-                             up[0],   up[1],   up[2], 0.0,
-                            dir[0],  dir[1],  dir[2], 0.0,
-                               0.0,     0.0,     0.0, 1.0))
-            radius = 1.5
-            slices = 8
-            stack = 1
-            gluCylinder(quadObj, radius, radius, boneLength, slices, stack)
-            glPopMatrix()
-
-        def _RenderJoint(quadObj):
-            if quadObj is None:
-                quadObj = GLUQuadric()
-            gluQuadricDrawStyle(quadObj, GLU_FILL)
-            gluQuadricNormals(quadObj, GLU_SMOOTH)
-
-            if self.drawMode == 0:  # rotation mode
-                glColor3f(1.000, 0.271, 0.000)
-            else:                   # position mode
-                glColor3f(0.000, 1.052, 0.000)
-
-            gluSphere(quadObj, 3.0, 16, 16)            
-
-            if self.drawMode == 0:  # rotation mode
-                glColor3f(1.000, 0.549, 0.000)
-            else:                   # position mode
-                glColor3f(0.000, 1.000, 0.000)
-
-        def _RenderFigure(node:BVHNode):
-            quadObj = None
-            glPushMatrix()
-            if self.drawMode == 0:
-                # Translate
-                if node.nodeIndex == 0:     # ROOT
-                    glTranslatef(self.motion[self.frameCount][0] * self.scale,
-                                 self.motion[self.frameCount][1] * self.scale,
-                                 self.motion[self.frameCount][2] * self.scale)
-                else:   # general node
-                    glTranslatef(node.offset[0] * self.scale, node.offset[1] * self.scale, node.offset[2] * self.scale)
-
-                # Rotation
-                for i, channel in enumerate(node.chLabel):
-                    if "Xrotation" in channel:
-                        glRotatef(self.motion[self.frameCount][node.frameIndex + i], 1.0, 0.0, 0.0)
-                    elif "Yrotation" in channel:
-                        glRotatef(self.motion[self.frameCount][node.frameIndex + i], 0.0, 1.0, 0.0)
-                    elif "Zrotation" in channel:
-                        glRotatef(self.motion[self.frameCount][node.frameIndex + i], 0.0, 0.0, 1.0)
-                
-                # Drawing Links
-                if node.fHaveSite:
-                    _RenderBone(quadObj, 0.0, 0.0, 0.0, node.site[0] * self.scale, node.site[1] * self.scale, node.site[2] * self.scale)
-                for child in node.childNode:
-                    _RenderBone(quadObj, 0.0, 0.0, 0.0, child.offset[0] * self.scale, child.offset[1] * self.scale, child.offset[2] * self.scale)
-                
-                # Drawing Joint Sphere
-                _RenderJoint(quadObj)
-
-                # Child drawing
-                for child in node.childNode:
-                    _RenderFigure(child)
-            glPopMatrix()
-
-        # drawSkeleton Main Codes
-        if (self.root is not None) and (self.motion is not None):
-            if self.drawMode == 0:  # rotation mode
-                glColor3f(1.000, 0.549, 0.000)
-            else:                   # position mode
-                glColor3f(0.000, 1.000, 0.000)
-            _RenderFigure(self.root)
-        pass
-
-
 
     def makeFloorObject(self, height):
         size = 50
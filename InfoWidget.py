@@ -2,11 +2,13 @@
 
 # "BVHPlayerPy" Current BVH file info & Playing frame info
 # Author: T.Shuhei
-# Last Modified: 2017/09/28
+# Last Modified: 2026/10/18
 
 import numpy as np
 from PyQt5.Qt import *
 
+from MotionCodec import CompressedMotion
+
 class InfoWidget(QGroupBox):
     def __init__(self, parent = None):
         super().__init__(parent)
@@ -24,10 +26,20 @@ class InfoWidget(QGroupBox):
         frameRowName.setText("Frame:")
         frameInfoLayout.addWidget(frameRowName)
         self.frameCounter = QLabel()
+        # fixed size, so per-frame text changes don't invalidate the layout
+        self.frameCounter.setFixedSize(self.frameCounter.fontMetrics().width("00000000"), self.frameCounter.sizeHint().height())
         frameInfoLayout.addWidget(self.frameCounter)
         self.framesLabel = QLabel()
         frameInfoLayout.addWidget(self.framesLabel)
         mainLayout.addLayout(frameInfoLayout)
+
+        self.loadLabel = QLabel()
+        mainLayout.addWidget(self.loadLabel)
+        self.loadLabel.setVisible(False)
+
+        self.memoryLabel = QLabel()
+        mainLayout.addWidget(self.memoryLabel)
+        self.memoryLabel.setVisible(False)
         
         self.initInfo("-  [Press 'Ctrl+L' or File/Open ...]", 0, 1)
         
@@ -51,3 +63,18 @@ class InfoWidget(QGroupBox):
     def resetFrameCount(self):
         self.frameCount = 0
         self.frameCounter.setText(str(0))
+
+    def updateLoadProgress(self, bytesDone, bytesTotal, frames):
+        percent = int(100 * bytesDone / bytesTotal) if bytesTotal > 0 else 100
+        self.loadLabel.setText("Loading : " + str(percent) + " %  (" + str(frames) + " frames)")
+        self.loadLabel.setVisible(True)
+
+    def finishLoadProgress(self):
+        self.loadLabel.setVisible(False)
+
+    # Size, ratio and reconstruction error of a compressed motion; hidden otherwise
+    def updateMemory(self, motion):
+        if isinstance(motion, CompressedMotion):
+            self.memoryLabel.setText("Memory : %.1f MB  (x%.1f, max error %.3g)" %
+                                     (motion.nbytes / 1e6, motion.compressionRatio, motion.maxError))
+        self.memoryLabel.setVisible(isinstance(motion, CompressedMotion))
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Vectorized forward kinematics
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import numpy as np
+
+from python_bvh import BVHNode
+from Skeleton import compileSkeleton
+
+class ForwardKinematics:
+    chunkSize = 4096    # frames evaluated per batch
+    jumpFrames = 16     # batches up to this size use pointer jumping
+
+    def __init__(self, root:BVHNode):
+        skeleton = compileSkeleton(root)
+        self.skeleton = skeleton
+        self.parents = skeleton.parents
+        self.offsets = skeleton.offsets
+        self.siteJoints = skeleton.siteJoints
+        self.siteOffsets = skeleton.siteOffsets
+        self.positionColumns = skeleton.positionColumns
+        self.rotationColumns = skeleton.rotationColumns
+        self.rotationAxes = skeleton.rotationAxes
+        self.hasPosition = skeleton.hasPosition
+        self.levels = skeleton.levels
+        self.bones = skeleton.bones
+        self.topologyKey = skeleton.topologyKey
+
+    @property
+    def numJoints(self):
+        return self.skeleton.numJoints
+
+    @property
+    def numPoints(self):
+        return self.skeleton.numPoints
+
+    def localTransforms(self, motion):
+        padded = _padded(motion)
+        rotation = None
+        for slot in range(3):
+            r = _axisAngleMatrices(self.rotationAxes[:, slot], np.radians(padded[:, self.rotationColumns[:, slot]]))
+            rotation = r if rotation is None else np.matmul(rotation, r)
+        return rotation, self._translations(padded)
+
+    def localTranslations(self, motion):
+        return self._translations(_padded(motion))
+
+    def _translations(self, padded):
+        translation = np.broadcast_to(self.offsets, (len(padded),) + self.offsets.shape).copy()
+        for axis in range(3):
+            columns = self.positionColumns[:, axis]
+            translation[:, self.hasPosition, axis] = padded[:, columns[self.hasPosition]]
+        return translation
+
+    def worldTransforms(self, motion):
+        frames = len(motion)
+        result = np.empty((frames, self.numJoints, 4, 4), dtype=np.float64)
+        result[..., 3, :] = (0.0, 0.0, 0.0, 1.0)
+        for begin in range(0, frames, self.chunkSize):
+            end = min(begin + self.chunkSize, frames)
+            rotation, translation = self._evaluate(motion[begin:end])
+            result[begin:end, :, :3, :3] = rotation
+            result[begin:end, :, :3, 3] = translation
+        return result
+
+    def jointPositions(self, motion, dtype=np.float32):
+        frames = len(motion)
+        result = np.empty((frames, self.numPoints, 3), dtype=dtype)
+        for begin in range(0, frames, self.chunkSize):
+            end = min(begin + self.chunkSize, frames)
+            result[begin:end] = self._points(*self._evaluate(motion[begin:end]))
+        return result
+
+    # World-space points (frames, points, 3) and joint rotations (frames, joints, 3, 3)
+    def worldPoses(self, motion):
+        rotation, translation = self._evaluate(motion)
+        return self._points(rotation, translation), rotation
+
+    def localQuaternions(self, motion):
+        padded = _padded(motion)
+        result = None
+        for slot in range(3):
+            q = _axisAngleQuaternions(self.rotationAxes[:, slot], np.radians(padded[:, self.rotationColumns[:, slot]]))
+            result = q if result is None else quaternionMultiply(result, q)
+        return result
+
+    def positionsFromLocal(self, quaternions, translation, siteOffsets=None):
+        return self._points(*self._propagate(quaternionToMatrix(quaternions), translation), siteOffsets)
+
+    def _evaluate(self, motion):
+        return self._propagate(*self.localTransforms(motion))
+
+    def _propagate(self, rotation, translation):
+        if (len(rotation) <= self.jumpFrames) and (len(self.levels) > 4):
+            return self._propagateByJumping(rotation, translation)
+        for level in self.levels:
+            parent = self.parents[level]
+            translation[:, level] = translation[:, parent] + np.einsum("fjab,fjb->fja", rotation[:, parent], translation[:, level])
+            rotation[:, level] = np.matmul(rotation[:, parent], rotation[:, level])
+        return rotation, translation
+
+    # Pointer jumping: every joint composes with its current ancestor, whose pointer
+    # then doubles, so a deep chain takes log2(depth) vectorized steps instead of depth
+    def _propagateByJumping(self, rotation, translation):
+        ancestors = self.parents.copy()
+        while True:
+            joints = np.flatnonzero(ancestors >= 0)
+            if len(joints) == 0:
+                return rotation, translation
+            parent = ancestors[joints]
+            parentRotation = rotation[:, parent]
+            translation[:, joints] = translation[:, parent] + np.einsum("fjab,fjb->fja", parentRotation, translation[:, joints])
+            rotation[:, joints] = np.matmul(parentRotation, rotation[:, joints])
+            ancestors[joints] = ancestors[parent]
+
+    def _points(self, rotation, translation, siteOffsets=None):
+        if len(self.siteJoints) == 0:
+            return translation
+        if siteOffsets is None:
+            siteOffsets = self.siteOffsets      # or (frames, sites, 3) for a batch of skeletons
+        sites = translation[:, self.siteJoints] + np.matmul(rotation[:, self.siteJoints], siteOffsets[..., None])[..., 0]
+        return np.concatenate((translation, sites), axis=1)
+
+
+# Euler channels converted to quaternions once, so any fractional frame costs
+# one slerp over all joints plus a single-frame forward kinematics pass
+# Without precompute (streamed motion) the two bracketing frames are converted per call.
+class PoseTrack:
+    def __init__(self, kinematics:ForwardKinematics, motion, dtype=np.float32, precompute=True):
+        self.kinematics = kinematics
+        self.motion = motion
+        self.frames = len(motion)
+        self.quaternions = None
+        self.translations = None
+        if precompute:
+            self.precompute(dtype)
+
+    # May run on another thread: the track is published only once complete, and
+    # until then bracket converts frames on demand
+    def precompute(self, dtype=np.float32, isCancelled=None):
+        kinematics = self.kinematics
+        motion = self.motion
+        quaternions = np.empty((self.frames, kinematics.numJoints, 4), dtype=dtype)
+        translations = np.empty((self.frames, int(kinematics.hasPosition.sum()), 3), dtype=dtype)
+        for begin in range(0, self.frames, kinematics.chunkSize):
+            if (isCancelled is not None) and isCancelled():
+                return False
+            end = min(begin + kinematics.chunkSize, self.frames)
+            chunk = motion[begin:end]
+            quaternions[begin:end] = kinematics.localQuaternions(chunk)
+            translations[begin:end] = kinematics.localTranslations(chunk)[:, kinematics.hasPosition]
+        self.translations = translations
+        self.quaternions = quaternions      # last: bracket tests it
+        return True
+
+    # Local rotations/translations of the two frames around "position" and the blend weight
+    def bracket(self, position):
+        i0 = int(np.floor(position)) % self.frames
+        i1 = min(i0 + 1, self.frames - 1)
+        t = position - np.floor(position)
+
+        if self.quaternions is None:
+            rows = self.motion[[i0, i1]]
+            q0, q1 = self.kinematics.localQuaternions(rows)
+            t0, t1 = self.kinematics.localTranslations(rows)[:, self.kinematics.hasPosition]
+        else:
+            q0, q1 = self.quaternions[i0], self.quaternions[i1]
+            t0, t1 = self.translations[i0], self.translations[i1]
+        return q0, q1, t0, t1, t
+
+    def positionsAt(self, position):
+        return batchPositions([self], [position])[0]
+
+
+# Poses of several tracks sharing one topology, in a single forward kinematics pass
+def batchPositions(tracks, positions):
+    kinematics = tracks[0].kinematics
+    brackets = [track.bracket(position) for track, position in zip(tracks, positions)]
+    q0, q1, t0, t1, t = [np.array([b[i] for b in brackets]) for i in range(5)]
+
+    quaternions = slerp(q0, q1, t[:, None])
+    translation = np.array([track.kinematics.offsets for track in tracks])
+    translation[:, kinematics.hasPosition] = (1.0 - t[:, None, None]) * t0 + t[:, None, None] * t1
+    siteOffsets = np.array([track.kinematics.siteOffsets for track in tracks])
+    return kinematics.positionsFromLocal(quaternions, translation, siteOffsets)
+
+
+## Quaternion helpers, (w, x, y, z) in the last axis
+def quaternionMultiply(a, b):
+    aw, ax, ay, az = np.moveaxis(a, -1, 0)
+    bw, bx, by, bz = np.moveaxis(b, -1, 0)
+    return np.stack((aw*bw - ax*bx - ay*by - az*bz,
+                     aw*bx + ax*bw + ay*bz - az*by,
+                     aw*by - ax*bz + ay*bw + az*bx,
+                     aw*bz + ax*by - ay*bx + az*bw), axis=-1)
+
+def quaternionToMatrix(q):
+    q = np.asarray(q, dtype=np.float64)
+    w, x, y, z = np.moveaxis(q / np.linalg.norm(q, axis=-1, keepdims=True), -1, 0)
+    return np.stack((np.stack((1 - 2*(y*y + z*z), 2*(x*y - w*z), 2*(x*z + w*y)), axis=-1),
+                     np.stack((2*(x*y + w*z), 1 - 2*(x*x + z*z), 2*(y*z - w*x)), axis=-1),
+                     np.stack((2*(x*z - w*y), 2*(y*z + w*x), 1 - 2*(x*x + y*y)), axis=-1)), axis=-2)
+
+def matrixToQuaternion(m):
+    m = np.asarray(m, dtype=np.float64)
+    m00, m11, m22 = m[..., 0, 0], m[..., 1, 1], m[..., 2, 2]
+    trace = m00 + m11 + m22
+    # Four algebraically equal forms; each is stable where its own term is largest
+    s = 2.0 * np.sqrt(np.maximum(1.0 + np.stack((trace, m00 - m11 - m22, m11 - m00 - m22, m22 - m00 - m11)), 1e-12))
+    a, b, c = m[..., 2, 1] - m[..., 1, 2], m[..., 0, 2] - m[..., 2, 0], m[..., 1, 0] - m[..., 0, 1]
+    d, e, f = m[..., 0, 1] + m[..., 1, 0], m[..., 0, 2] + m[..., 2, 0], m[..., 1, 2] + m[..., 2, 1]
+    candidates = np.stack((np.stack((s[0] / 4, a / s[0], b / s[0], c / s[0]), axis=-1),
+                           np.stack((a / s[1], s[1] / 4, d / s[1], e / s[1]), axis=-1),
+                           np.stack((b / s[2], d / s[2], s[2] / 4, f / s[2]), axis=-1),
+                           np.stack((c / s[3], e / s[3], f / s[3], s[3] / 4), axis=-1)))
+    best = np.argmax(np.stack((trace, m00, m11, m22)), axis=0)
+    q = np.take_along_axis(candidates, best[None, ..., None], axis=0)[0]
+    q = np.where(q[..., :1] < 0.0, -q, q)
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+def slerp(q0, q1, t):
+    q0 = np.asarray(q0, dtype=np.float64)
+    q1 = np.asarray(q1, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)[..., None]
+    dot = np.sum(q0 * q1, axis=-1, keepdims=True)
+    q1 = np.where(dot < 0.0, -q1, q1)   # shortest path
+    dot = np.clip(np.abs(dot), 0.0, 1.0)
+
+    theta = np.arccos(dot)
+    sinTheta = np.sin(theta)
+    near = sinTheta < 1e-6      # nearly parallel, fall back to lerp
+    safeSin = np.where(near, 1.0, sinTheta)
+    w0 = np.where(near, 1.0 - t, np.sin((1.0 - t) * theta) / safeSin)
+    w1 = np.where(near, t, np.sin(t * theta) / safeSin)
+    result = w0 * q0 + w1 * q1
+    return result / np.linalg.norm(result, axis=-1, keepdims=True)
+
+
+## Support Functions
+def _padded(motion):
+    # Appends a zero column so that channel column -1 reads 0.0
+    motion = np.asarray(motion, dtype=np.float64)
+    motion = motion.reshape(-1, motion.shape[-1])
+    return np.concatenate((motion, np.zeros((len(motion), 1))), axis=1)
+
+def _axisAngleMatrices(axes, angles):
+    # Rodrigues' formula; axes:(J,3) unit or zero vectors, angles:(F,J) radians
+    c = np.cos(angles)[..., None, None]
+    s = np.sin(angles)[..., None, None]
+    x, y, z = axes[:, 0], axes[:, 1], axes[:, 2]
+    zero = np.zeros_like(x)
+    cross = np.stack((np.stack((zero, -z, y), axis=-1),
+                      np.stack((z, zero, -x), axis=-1),
+                      np.stack((-y, x, zero), axis=-1)), axis=-2)
+    outer = axes[:, :, None] * axes[:, None, :]
+    return c * np.eye(3) + s * cross + (1.0 - c) * outer
+
+def _axisAngleQuaternions(axes, angles):
+    half = 0.5 * angles[..., None]
+    return np.concatenate((np.cos(half), np.sin(half) * axes), axis=-1)
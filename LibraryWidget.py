@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Motion library browser
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import os
+from PyQt5.Qt import *
+
+from MotionLibrary import MotionLibrary
+
+# Scans a folder into the index with its own connection, off the GUI thread
+class ScanThread(QThread):
+    progress = pyqtSignal(int, int)
+    scanned = pyqtSignal(int, int)     # files described, files failed
+
+    def __init__(self, indexPath, rootDir, parent=None):
+        super().__init__(parent)
+        self.indexPath = indexPath
+        self.rootDir = rootDir
+        self.fCancel = False
+
+    def cancel(self):
+        self.fCancel = True
+
+    def isCancelled(self):
+        return self.fCancel
+
+    def run(self):
+        library = MotionLibrary(self.indexPath)
+        try:
+            described, failed = library.scan(self.rootDir, self.isCancelled, self.progress.emit)
+        finally:
+            library.close()
+        if not self.fCancel:
+            self.scanned.emit(described, len(failed))
+
+# Front view of the stored first-frame pose
+class PreviewWidget(QWidget):
+    boneColor = QColor(255, 140, 0)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFixedSize(160, 160)
+        self.points = None
+        self.bones = None
+
+    def setPose(self, pose):
+        self.points, self.bones = (None, None) if pose is None else pose
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(51, 51, 51))
+        if (self.points is None) or (len(self.points) == 0):
+            return
+        xy = self.points[:, :2] * (1.0, -1.0)
+        lo, hi = xy.min(axis=0), xy.max(axis=0)
+        scale = 0.9 * min(self.width(), self.height()) / max(1e-6, (hi - lo).max())
+        xy = (xy - (lo + hi) / 2.0) * scale + (self.width() / 2.0, self.height() / 2.0)
+        painter.setPen(self.boneColor)
+        painter.drawLines([QLineF(*xy[a], *xy[b]) for a, b in self.bones])
+
+
+# Double-click a row to open it; files already in the parse cache open without parsing
+class LibraryWidget(QWidget):
+    hParentWidget = None
+    maxRows = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.hParentWidget = parent
+        self.setWindowTitle("Motion Library")
+        self.resize(720, 420)
+        self.library = MotionLibrary()
+        self.scanThread = None
+        self.rootDir = parent.pathMotionFileDir
+
+        folderLayout = QHBoxLayout()
+        self.folderButton = QPushButton("Folder...")
+        self.folderButton.clicked.connect(self.chooseFolder)
+        folderLayout.addWidget(self.folderButton)
+        self.rescanButton = QPushButton("Rescan")
+        self.rescanButton.clicked.connect(self.startScan)
+        folderLayout.addWidget(self.rescanButton)
+        self.statusLabel = QLabel()
+        folderLayout.addWidget(self.statusLabel, 1)
+
+        filterLayout = QHBoxLayout()
+        self.searchEdit = QLineEdit()
+        self.searchEdit.setPlaceholderText("Search file or joint names")
+        self.searchEdit.textChanged.connect(self.refresh)
+        filterLayout.addWidget(self.searchEdit, 1)
+        self.sameSkeletonBox = QCheckBox("Same skeleton")
+        self.sameSkeletonBox.setToolTip("Only takes sharing the current motion's hierarchy")
+        self.sameSkeletonBox.toggled.connect(self.refresh)
+        filterLayout.addWidget(self.sameSkeletonBox)
+
+        self.resultGrid = QTableWidget(0, 5)
+        self.resultGrid.setHorizontalHeaderLabels(["File", "Frames", "FPS", "Duration", "Joints"])
+        self.resultGrid.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.resultGrid.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.resultGrid.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.resultGrid.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.resultGrid.itemSelectionChanged.connect(self.showPreview)
+        self.resultGrid.cellDoubleClicked.connect(self.openRow)
+        self.previewPanel = PreviewWidget(self)
+
+        resultLayout = QHBoxLayout()
+        resultLayout.addWidget(self.resultGrid, 1)
+        resultLayout.addWidget(self.previewPanel, 0, Qt.AlignTop)
+
+        mainLayout = QVBoxLayout()
+        mainLayout.addLayout(folderLayout)
+        mainLayout.addLayout(filterLayout)
+        mainLayout.addLayout(resultLayout)
+        self.setLayout(mainLayout)
+        self.refresh()
+
+    def chooseFolder(self):
+        dirPath = QFileDialog.getExistingDirectory(self, "Choose Motion Folder ...", self.rootDir)
+        if dirPath != "":
+            self.rootDir = dirPath
+            self.startScan()
+
+    def startScan(self):
+        self.cancelScan()
+        self.statusLabel.setText("Scanning " + self.rootDir + " ...")
+        self.scanThread = ScanThread(self.library.indexPath, self.rootDir, self)
+        self.scanThread.progress.connect(self.updateProgress)
+        self.scanThread.scanned.connect(self.finishScan)
+        self.scanThread.start()
+
+    def cancelScan(self):
+        if self.scanThread is not None:
+            self.scanThread.cancel()
+            self.scanThread.wait()
+            self.scanThread.deleteLater()
+            self.scanThread = None
+
+    def updateProgress(self, done, total):
+        if self.sender() is self.scanThread:
+            self.statusLabel.setText("Indexing " + str(done) + " / " + str(total))
+            if (done % 256 == 0) or (done == total):
+                self.refresh()
+
+    def finishScan(self, described, failed):
+        if self.sender() is self.scanThread:
+            text = str(self.library.count()) + " files indexed"
+            if failed != 0:
+                text += ", " + str(failed) + " unreadable"
+            self.statusLabel.setText(text)
+            self.refresh()
+
+    def refresh(self):
+        signature = None
+        if self.sameSkeletonBox.isChecked() and (self.hParentWidget.drawPanel.motion is not None):
+            signature = self.hParentWidget.currentSignature()
+        rows = self.library.search(self.searchEdit.text(), signature, limit=self.maxRows)
+        self.resultGrid.setUpdatesEnabled(False)
+        self.resultGrid.setRowCount(len(rows))
+        for i, (path, frames, frameTime, duration, numJoints, _) in enumerate(rows):
+            item = QTableWidgetItem(os.path.basename(path))
+            item.setData(Qt.UserRole, path)
+            item.setToolTip(path)
+            self.resultGrid.setItem(i, 0, item)
+            fps = 1.0 / frameTime if frameTime > 0 else 0.0
+            for column, text in enumerate((str(frames), "%.1f" % fps, "%.1f s" % duration, str(numJoints)), 1):
+                self.resultGrid.setItem(i, column, QTableWidgetItem(text))
+        self.resultGrid.setUpdatesEnabled(True)
+
+    def selectedPath(self):
+        rows = self.resultGrid.selectionModel().selectedRows()
+        return None if len(rows) == 0 else self.resultGrid.item(rows[0].row(), 0).data(Qt.UserRole)
+
+    def showPreview(self):
+        filePath = self.selectedPath()
+        self.previewPanel.setPose(None if filePath is None else self.library.preview(filePath))
+
+    def openRow(self, row, column):
+        filePath = self.resultGrid.item(row, 0).data(Qt.UserRole)
+        if os.path.exists(filePath):
+            self.hParentWidget.openFile(filePath)
+        else:
+            QMessageBox.warning(self, "BVH Player", "The file no longer exists. Rescan the folder.\n" + filePath)
+
+    def closeEvent(self, event):
+        self.cancelScan()
+        super().closeEvent(event)
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Binary cache of parsed BVH files
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import os
+import pickle
+import hashlib
+import numpy as np
+
+from python_bvh import BVHNode
+from MotionCodec import compressMotion, loadCompressed, CompressedMotion
+
+# One entry per source file: <key>.npy holds the motion (memory-mapped on load),
+# <key>.pkl the hierarchy plus the size/mtime the entry was built from. With
+# compress, the motion goes to <key>.mcz as a CompressedMotion instead; such
+# entries are only returned while compress is on.
+class MotionCache:
+    enabled = True
+    compress = False
+    maxBytes = 4 * 1024 * 1024 * 1024
+    chunkFrames = 4096
+
+    def __init__(self, cacheDir=None):
+        if cacheDir is None:
+            cacheDir = os.path.join(os.path.expanduser("~"), ".cache", "BVHPlayerPy")
+        self.cacheDir = cacheDir
+
+    def entryPaths(self, filePath):
+        key = hashlib.sha1(os.path.abspath(filePath).encode("utf-8")).hexdigest()
+        return os.path.join(self.cacheDir, key + ".pkl"), os.path.join(self.cacheDir, key + ".npy")
+
+    def load(self, filePath):
+        if not self.enabled:
+            return None
+        metaPath, motionPath = self.entryPaths(filePath)
+        try:
+            with open(metaPath, "rb") as f:
+                meta = pickle.load(f)
+            stat = os.stat(filePath)
+            if (meta["size"] != stat.st_size) or (meta["mtime"] != stat.st_mtime_ns):
+                self.remove(filePath)
+                return None
+            if meta.get("compressed", False) and not self.compress:
+                # lossy entry; re-parse so exports match the source again
+                self.remove(filePath)
+                return None
+            if meta.get("compressed", False):
+                motion = loadCompressed(motionPath[:-len(".npy")] + ".mcz")
+            else:
+                motion = np.load(motionPath, mmap_mode="r")
+        except (OSError, EOFError, ValueError, KeyError, pickle.UnpicklingError):
+            return None
+        os.utime(metaPath)     # last use, for eviction
+        return meta["root"], motion, meta["frames"], meta["frameTime"]
+
+    def store(self, filePath, root:BVHNode, motion, frames, frameTime, isCancelled=None):
+        if not self.enabled:
+            return False
+        os.makedirs(self.cacheDir, exist_ok=True)
+        metaPath, motionPath = self.entryPaths(filePath)
+        stat = os.stat(filePath)
+        fCompress = self.compress or isinstance(motion, CompressedMotion)
+        meta = {"path": os.path.abspath(filePath), "size": stat.st_size, "mtime": stat.st_mtime_ns,
+                "root": root, "frames": frames, "frameTime": frameTime, "compressed": fCompress}
+        stalePath = motionPath[:-len(".npy")] + ".mcz"    # the entry's other format, if it was stored before
+        if fCompress:
+            motionPath, stalePath = stalePath, motionPath
+
+        # Write to temporaries and rename, so a crash never leaves a half entry
+        tmpMotionPath = motionPath + ".tmp.npy"
+        tmpMetaPath = metaPath + ".tmp"
+        out = None
+        fStored = False
+        try:
+            if fCompress:
+                if not isinstance(motion, CompressedMotion):
+                    motion = compressMotion(root, motion, isCancelled=isCancelled)
+                motion.save(tmpMotionPath)
+            else:
+                out = np.lib.format.open_memmap(tmpMotionPath, mode="w+", dtype=np.float64, shape=(len(motion), motion.shape[1]))
+                for begin in range(0, len(motion), self.chunkFrames):
+                    if (isCancelled is not None) and isCancelled():
+                        raise InterruptedError
+                    out[begin:begin + self.chunkFrames] = motion[begin:begin + self.chunkFrames]
+                out.flush()
+                out = None
+            with open(tmpMetaPath, "wb") as f:
+                pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpMotionPath, motionPath)
+            os.replace(tmpMetaPath, metaPath)
+            if os.path.exists(stalePath):
+                os.remove(stalePath)
+            fStored = True
+        except (OSError, pickle.PicklingError, RecursionError):     # InterruptedError is an OSError
+            return False
+        finally:    # also when the source fails otherwise, e.g. a closed LazyMotion
+            if not fStored:
+                out = None      # release the mapping before removing the file
+                for path in (tmpMotionPath, tmpMetaPath):
+                    if os.path.exists(path):
+                        os.remove(path)
+        self.evict()
+        return True
+
+    def remove(self, filePath):
+        metaPath, motionPath = self.entryPaths(filePath)
+        for path in (metaPath, motionPath, motionPath[:-len(".npy")] + ".mcz"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    # Drops least recently used entries until the cache fits in maxBytes
+    def evict(self):
+        if not os.path.isdir(self.cacheDir):
+            return
+        entries = []
+        total = 0
+        for name in os.listdir(self.cacheDir):
+            if not name.endswith(".pkl"):
+                continue
+            metaPath = os.path.join(self.cacheDir, name)
+            motionPaths = [metaPath[:-len(".pkl")] + extension for extension in (".npy", ".mcz")]
+            try:
+                size = os.path.getsize(metaPath) + sum(os.path.getsize(path) for path in motionPaths if os.path.exists(path))
+                entries.append((os.path.getmtime(metaPath), size, metaPath, motionPaths))
+            except OSError:
+                continue
+            total += size
+        for lastUse, size, metaPath, motionPaths in sorted(entries):
+            if total <= self.maxBytes:
+                break
+            for path in [metaPath] + motionPaths:
+                if os.path.exists(path):
+                    os.remove(path)
+            total -= size
+
+    def clear(self):
+        if not os.path.isdir(self.cacheDir):
+            return
+        for name in os.listdir(self.cacheDir):
+            if name.endswith((".pkl", ".npy", ".mcz")):
+                os.remove(os.path.join(self.cacheDir, name))
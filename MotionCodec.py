@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Compressed motion storage
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import zlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+from python_bvh import BVHNode
+from Skeleton import compileSkeleton, POSITION
+
+# Per-channel error bounds: position channels in file units, the rest in degrees
+class CodecSettings:
+    positionError = 0.01
+    rotationError = 0.01
+    blockFrames = 256     # smaller blocks seek faster, larger ones compress slightly better
+    level = 3       # zlib level; 6 and above gain little on shuffled deltas at twice the time
+
+# Channels quantized to twice their error bound, delta coded along frames within
+# fixed-size blocks, byte-shuffled and deflated. Each block decodes on its own, so
+# reading any frame costs one block; it reads like LazyMotion (motion[i],
+# motion[begin:end], len(motion), np.asarray(motion)).
+class CompressedMotion:
+    cacheBlocks = 64
+    ndim = 2
+    dtype = np.dtype(np.float64)
+
+    def __init__(self, frames, steps, blockFrames, blocks, blockTypes, maxError=0.0):
+        self.frames = frames
+        self.channels = len(steps)
+        self.steps = steps
+        self.blockFrames = blockFrames
+        self.blocks = blocks            # deflated bytes per block
+        self.blockTypes = blockTypes    # integer dtype of each block's deltas
+        self.maxError = maxError
+        self.blockCache = OrderedDict()
+        self.lock = threading.RLock()
+
+    @property
+    def shape(self):
+        return (self.frames, self.channels)
+
+    @property
+    def nbytes(self):
+        return sum(len(block) for block in self.blocks) + self.steps.nbytes
+
+    @property
+    def compressionRatio(self):
+        return self.frames * self.channels * 8 / max(1, self.nbytes)
+
+    def __len__(self):
+        return self.frames
+
+    def __array__(self, dtype=None, copy=None):
+        result = self[0:self.frames]
+        return result if dtype is None else result.astype(dtype)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            rows = self[key[0]]
+            return rows[(Ellipsis,) + key[1:]] if np.ndim(rows) == 1 else rows[(slice(None),) + key[1:]]
+        if isinstance(key, slice):
+            begin, end, step = key.indices(self.frames)
+            if step != 1:
+                return self[begin:end][::step] if step > 0 else self[np.arange(begin, end, step)]
+            return self.rows(begin, end)
+        if isinstance(key, (int, np.integer)):
+            frame = int(key) + self.frames if key < 0 else int(key)
+            if not 0 <= frame < self.frames:
+                raise IndexError("frame index out of range")
+            return self.rows(frame, frame + 1)[0]
+        indices = np.asarray(key)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        indices = np.where(indices < 0, indices + self.frames, indices)
+        result = np.empty((len(indices), self.channels), dtype=self.dtype)
+        for block in np.unique(indices // self.blockFrames):
+            mask = (indices // self.blockFrames) == block
+            result[mask] = self.block(block)[indices[mask] - block * self.blockFrames]
+        return result
+
+    def rows(self, begin, end):
+        end = min(end, self.frames)
+        if end <= begin:
+            return np.empty((0, self.channels), dtype=self.dtype)
+        first, last = begin // self.blockFrames, (end - 1) // self.blockFrames
+        base = first * self.blockFrames
+        if first == last:
+            return self.block(first)[begin - base:end - base].copy()
+        return np.concatenate([self.block(k) for k in range(first, last + 1)])[begin - base:end - base]
+
+    def block(self, k):
+        with self.lock:
+            data = self.blockCache.get(k)
+            if data is not None:
+                self.blockCache.move_to_end(k)
+                return data
+        data = decodeBlock(self.blocks[k], self.blockTypes[k], min(self.blockFrames, self.frames - k * self.blockFrames), self.steps)
+        data.flags.writeable = False
+        with self.lock:
+            self.blockCache[k] = data
+            while len(self.blockCache) > self.cacheBlocks:
+                self.blockCache.popitem(last=False)
+        return data
+
+    def save(self, filePath):
+        offsets = np.cumsum([0] + [len(block) for block in self.blocks]).astype(np.int64)
+        with open(filePath, "wb") as f:
+            np.savez(f, frames=np.int64(self.frames), steps=self.steps, blockFrames=np.int64(self.blockFrames),
+                     offsets=offsets, blockTypes=np.array([t.str for t in self.blockTypes]),
+                     data=np.frombuffer(b"".join(self.blocks), dtype=np.uint8), maxError=np.float64(self.maxError))
+
+def loadCompressed(filePath):
+    with np.load(filePath) as f:
+        offsets, data = f["offsets"], f["data"].tobytes()
+        blocks = [data[offsets[k]:offsets[k + 1]] for k in range(len(offsets) - 1)]
+        return CompressedMotion(int(f["frames"]), f["steps"], int(f["blockFrames"]), blocks,
+                                [np.dtype(t) for t in f["blockTypes"]], float(f["maxError"]))
+
+# Reads motion (an array or LazyMotion) one block at a time
+def compressMotion(root:BVHNode, motion, settings=CodecSettings, isCancelled=None):
+    skeleton = compileSkeleton(root)
+    frames, channels = len(motion), motion.shape[1]
+    steps = np.full(channels, 2.0 * settings.rotationError)
+    steps[skeleton.channelColumns[skeleton.channelTypes == POSITION]] = 2.0 * settings.positionError
+    blocks, blockTypes, maxError = [], [], 0.0
+    for begin in range(0, frames, settings.blockFrames):
+        if (isCancelled is not None) and isCancelled():
+            raise InterruptedError
+        rows = np.asarray(motion[begin:begin + settings.blockFrames], dtype=np.float64)
+        quantized = np.rint(rows / steps).astype(np.int64)
+        maxError = max(maxError, float(np.abs(quantized * steps - rows).max()) if rows.size != 0 else 0.0)
+        data, blockType = encodeBlock(quantized, settings.level)
+        blocks.append(data)
+        blockTypes.append(blockType)
+    return CompressedMotion(frames, steps, settings.blockFrames, blocks, blockTypes, maxError)
+
+
+## Block coding
+def encodeBlock(quantized, level=6):
+    deltas = np.diff(quantized, axis=0, prepend=0)     # the first row keeps its absolute value
+    largest = int(np.abs(deltas).max()) if deltas.size != 0 else 0
+    blockType = next(np.dtype(t) for t in (np.int8, np.int16, np.int32, np.int64) if largest <= np.iinfo(t).max)
+    # channel-major, then byte planes: the mostly constant high bytes deflate well
+    values = np.ascontiguousarray(deltas.T, dtype=blockType)
+    planes = values.view(np.uint8).reshape(-1, blockType.itemsize).T
+    return zlib.compress(np.ascontiguousarray(planes).tobytes(), level), blockType
+
+def decodeBlock(data, blockType, frames, steps):
+    planes = np.frombuffer(zlib.decompress(data), dtype=np.uint8).reshape(blockType.itemsize, -1)
+    values = np.ascontiguousarray(planes.T).view(blockType).reshape(len(steps), frames)
+    return np.cumsum(values.T, axis=0, dtype=np.int64) * steps
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Motion energy curve and its min/max pyramid
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import numpy as np
+
+from Kinematics import ForwardKinematics
+
+# Mean joint speed per frame (units per second). Positions are evaluated a chunk at
+# a time unless already precomputed; the first frame repeats the second.
+def motionEnergy(kinematics:ForwardKinematics, motion, frameTime, positions=None, chunkFrames=4096, isCancelled=None):
+    frames = len(motion)
+    energy = np.zeros(frames, dtype=np.float64)
+    if frames < 2:
+        return energy
+    previous = None
+    for begin in range(0, frames, chunkFrames):
+        if (isCancelled is not None) and isCancelled():
+            raise InterruptedError
+        end = min(begin + chunkFrames, frames)
+        points = positions[begin:end] if positions is not None else kinematics.jointPositions(motion[begin:end])
+        points = points[:, :kinematics.numJoints]
+        if previous is not None:
+            points = np.concatenate((previous, points))
+        speed = np.linalg.norm(np.diff(points, axis=0), axis=2).mean(axis=1)
+        energy[end - len(speed):end] = speed
+        previous = points[-1:]
+    energy[0] = energy[1]
+    return energy / frameTime if frameTime > 0 else energy
+
+# Level k holds the min and max of blocks of 2**k frames, so any range at any
+# width is summarized from about two blocks per pixel.
+class EnergyPyramid:
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.frames = len(values)
+        self.levels = [(values, values)]
+        lo, hi = values, values
+        while len(lo) > 1:
+            if len(lo) % 2 == 1:
+                lo, hi = np.append(lo, lo[-1]), np.append(hi, hi[-1])
+            lo, hi = np.minimum(lo[0::2], lo[1::2]), np.maximum(hi[0::2], hi[1::2])
+            self.levels.append((lo, hi))
+
+    @property
+    def maxValue(self):
+        return float(self.levels[-1][1][0]) if self.frames > 0 else 0.0
+
+    # (mins, maxs) for "width" pixel columns covering frames [begin, end)
+    def envelope(self, begin, end, width):
+        if (self.frames == 0) or (width <= 0) or (end <= begin):
+            return np.zeros(0), np.zeros(0)
+        perPixel = (end - begin) / float(width)
+        k = int(np.clip(np.floor(np.log2(perPixel)), 0, len(self.levels) - 1)) if perPixel >= 1.0 else 0
+        lo, hi = self.levels[k]
+        edges = np.floor(np.linspace(begin, end, width + 1) / 2 ** k).astype(np.int64)
+        starts = np.clip(edges[:-1], 0, len(lo) - 1)
+        stop = int(np.clip(max(edges[-1], starts[-1] + 1), 1, len(lo)))
+        return np.minimum.reduceat(lo[:stop], starts), np.maximum.reduceat(hi[:stop], starts)
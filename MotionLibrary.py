@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Indexed catalog of motion files
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import os
+import sqlite3
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+from BVHStream import readBVHStream
+from Kinematics import ForwardKinematics
+
+# Skeletons with the same signature have the same joints, channels and end sites
+def hierarchySignature(kinematics:ForwardKinematics):
+    return hashlib.sha1(b"".join(kinematics.topologyKey)).hexdigest()[:16]
+
+# Header-only read: hierarchy, frame count, frame time and the first frame's pose.
+# Runs in the scan's worker processes, so it returns plain values.
+def describeFile(filePath):
+    stat = os.stat(filePath)
+    root, motion, frames, frameTime = readBVHStream(filePath)
+    try:
+        kinematics = ForwardKinematics(root)
+        preview = kinematics.jointPositions(motion[0:1])[0].astype(np.float32) if frames > 0 else np.zeros((0, 3), np.float32)
+    finally:
+        motion.close()
+    return {"path": os.path.abspath(filePath), "size": stat.st_size, "mtime": stat.st_mtime_ns,
+            "signature": hierarchySignature(kinematics), "joints": " ".join(kinematics.skeleton.names),
+            "numJoints": kinematics.numJoints, "frames": frames, "frameTime": frameTime, "duration": frames * frameTime,
+            "preview": preview.tobytes(), "bones": kinematics.bones.astype(np.int32).tobytes()}
+
+def _describe(filePath):
+    try:
+        return filePath, describeFile(filePath), None
+    except Exception as e:
+        return filePath, None, str(e)
+
+
+# One row per .bvh file, keyed by absolute path. Rescanning only re-reads files
+# whose size or mtime changed, and forgets files that are gone.
+class MotionLibrary:
+    extensions = (".bvh",)
+    workers = None      # process pool size; None uses every core
+    commitRows = 256
+
+    def __init__(self, indexPath=None):
+        if indexPath is None:
+            indexPath = os.path.join(os.path.expanduser("~"), ".cache", "BVHPlayerPy", "library.sqlite")
+        os.makedirs(os.path.dirname(os.path.abspath(indexPath)), exist_ok=True)
+        self.indexPath = indexPath
+        self.db = sqlite3.connect(indexPath)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS motions (path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, "
+                        "signature TEXT, joints TEXT, numJoints INTEGER, frames INTEGER, frameTime REAL, "
+                        "duration REAL, preview BLOB, bones BLOB)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS motionsSignature ON motions (signature)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS motionsDuration ON motions (duration)")
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def listFiles(self, rootDir):
+        result = {}
+        for dirPath, _, fileNames in os.walk(rootDir):
+            for fileName in fileNames:
+                if fileName.lower().endswith(self.extensions):
+                    filePath = os.path.abspath(os.path.join(dirPath, fileName))
+                    try:
+                        stat = os.stat(filePath)
+                    except OSError:
+                        continue
+                    result[filePath] = (stat.st_size, stat.st_mtime_ns)
+        return result
+
+    # Returns (files described, files failed); progress(done, total) after each file
+    def scan(self, rootDir, isCancelled=None, progress=None):
+        files = self.listFiles(rootDir)
+        prefix = os.path.join(os.path.abspath(rootDir), "")
+        known = {path: (size, mtime) for path, size, mtime in
+                 self.db.execute("SELECT path, size, mtime FROM motions WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))}
+        self.db.executemany("DELETE FROM motions WHERE path = ?", [(path,) for path in known if path not in files])
+        self.db.commit()
+        stale = [path for path, stamp in files.items() if known.get(path) != stamp]
+
+        described, failed = 0, []
+        if len(stale) == 0:
+            return described, failed
+        rows = []
+        with ProcessPoolExecutor(self.workers) as executor:
+            futures = [executor.submit(_describe, path) for path in stale]
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    if (isCancelled is not None) and isCancelled():
+                        raise InterruptedError
+                    filePath, entry, error = future.result()
+                    if entry is None:
+                        failed.append((filePath, error))
+                    else:
+                        rows.append(entry)
+                        described += 1
+                    if len(rows) >= self.commitRows:
+                        self.insert(rows)
+                        rows = []
+                    if progress is not None:
+                        progress(done, len(stale))
+            except InterruptedError:
+                for future in futures:
+                    future.cancel()
+            finally:
+                self.insert(rows)
+        return described, failed
+
+    def insert(self, rows):
+        self.db.executemany("INSERT OR REPLACE INTO motions VALUES (:path, :size, :mtime, :signature, :joints, :numJoints, "
+                            ":frames, :frameTime, :duration, :preview, :bones)", rows)
+        self.db.commit()
+
+    # Every word must appear in the path or the joint names; all filters are optional
+    def search(self, text="", signature=None, minDuration=None, maxDuration=None, limit=1000):
+        clauses, params = [], []
+        for word in text.split():
+            clauses.append("(path LIKE ? ESCAPE '\\' OR joints LIKE ? ESCAPE '\\')")
+            word = word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")    # literal, not wildcards
+            params += ["%" + word + "%"] * 2
+        if signature is not None:
+            clauses.append("signature = ?")
+            params.append(signature)
+        if minDuration is not None:
+            clauses.append("duration >= ?")
+            params.append(minDuration)
+        if maxDuration is not None:
+            clauses.append("duration <= ?")
+            params.append(maxDuration)
+        where = (" WHERE " + " AND ".join(clauses)) if len(clauses) != 0 else ""
+        return self.db.execute("SELECT path, frames, frameTime, duration, numJoints, signature FROM motions" + where +
+                               " ORDER BY path LIMIT ?", params + [limit]).fetchall()
+
+    # (points, bones) of the stored first-frame pose, or None
+    def preview(self, filePath):
+        row = self.db.execute("SELECT preview, bones FROM motions WHERE path = ?", (filePath,)).fetchone()
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.float32).reshape(-1, 3), np.frombuffer(row[1], dtype=np.int32).reshape(-1, 2)
+
+    def count(self):
+        return self.db.execute("SELECT COUNT(*) FROM motions").fetchone()[0]
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Background BVH loading
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import os
+from PyQt5.Qt import *
+
+from python_bvh import BVH
+from BVHStream import readBVHStream
+from MotionCache import MotionCache
+from MotionCodec import compressMotion
+
+# Cache hits and small files are parsed whole; large files are handed to the GUI
+# as soon as the header is read and their frames are indexed here while playing.
+# With fCompress, fully parsed motions are handed over as a CompressedMotion.
+class MotionLoader(QThread):
+    motionReady = pyqtSignal(str, object, object, int, float)  # filePath, root, motion, frames, frameTime
+    progress = pyqtSignal(int, int, int)                        # bytes indexed, total bytes, frames indexed
+    failed = pyqtSignal(str)
+
+    def __init__(self, filePath, motionCache:MotionCache, streamingThreshold, parent=None, fCompress=False):
+        super().__init__(parent)
+        self.filePath = filePath
+        self.motionCache = motionCache
+        self.streamingThreshold = streamingThreshold
+        self.fCompress = fCompress
+        self.fCancel = False
+        self.motion = None      # the motion handed over, which this thread may still read
+
+    def cancel(self):
+        self.fCancel = True
+
+    def isCancelled(self):
+        return self.fCancel
+
+    def run(self):
+        try:
+            cached = self.motionCache.load(self.filePath)
+            if cached is not None:
+                self.motion = cached[1]
+                self.motionReady.emit(self.filePath, *cached)
+                return
+
+            size = os.path.getsize(self.filePath)
+            if size < self.streamingThreshold:
+                root, motion, frames, frameTime = BVH.readBVH(self.filePath)
+                resident = motion
+                if self.fCompress and not self.fCancel:
+                    resident = compressMotion(root, motion, isCancelled=self.isCancelled)
+                if not self.fCancel:
+                    self.motion = resident
+                    self.motionReady.emit(self.filePath, root, resident, frames, frameTime)
+                    self.progress.emit(size, size, frames)
+                    stored = resident if self.motionCache.compress else motion    # no second compression pass
+                    self.motionCache.store(self.filePath, root, stored, frames, frameTime, self.isCancelled)
+                return
+
+            root, motion, frames, frameTime = readBVHStream(self.filePath)
+            if self.fCancel:
+                return
+            self.motion = motion
+            self.motionReady.emit(self.filePath, root, motion, frames, frameTime)
+            while not (motion.isIndexed or self.fCancel):
+                motion.indexBlock()
+                self.progress.emit(motion.indexPos, motion.size, motion.availableFrames)
+            if not self.fCancel:
+                self.motionCache.store(self.filePath, root, motion, frames, frameTime, self.isCancelled)
+        except Exception as e:
+            if not self.fCancel:
+                self.failed.emit(os.path.basename(self.filePath) + ": " + str(e))
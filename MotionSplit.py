@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" GUI-free motion splitting
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+from python_bvh import BVHNode
+from BVHWriter import BVHWriter
+from PositionExport import exportPositions, positionFormats
+from Resample import resampleMotion
+
+fileFormats = dict({"bvh": ".bvh", "npz": ".npz"}, **positionFormats)
+
+def splitFileName(origFileName, row, fileFormat="bvh"):
+    strRow = str(row) if row > 10 else "0" + str(row)
+    return origFileName.split(".")[0] + "_" + strRow + fileFormats[fileFormat]
+
+# Pass the same writer for every segment of a skeleton to reuse its HIERARCHY text.
+# With targetFrameTime the segment is resampled to that rate before it is written.
+def exportSegment(dstFilePath, root:BVHNode, motion, begin, end, frameTime, writer=None, fileFormat="bvh", targetFrameTime=None):
+    if not 0 <= begin < end <= len(motion):
+        raise ValueError("invalid frame range " + str(begin) + "-" + str(end))
+    if writer is None:
+        writer = BVHWriter()
+    if (targetFrameTime is not None) and (abs(targetFrameTime - frameTime) > 1e-9):
+        if targetFrameTime <= 0:
+            raise ValueError("invalid frame time " + str(targetFrameTime))
+        motion = resampleMotion(root, motion[begin:end], frameTime, targetFrameTime)
+        begin, end, frameTime = 0, len(motion), targetFrameTime
+    if fileFormat in positionFormats:     # world-space joint positions instead of channels
+        exportPositions(dstFilePath, root, motion, begin, end, fileFormat)
+    elif fileFormat == "npz":
+        writer.writeBinary(dstFilePath, root, motion[begin:end], end - begin, frameTime)
+    else:
+        writer.write(dstFilePath, root, motion[begin:end], end - begin, frameTime)
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Wall-clock playback timing
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import time
+
+class PlaybackClock:
+    position = 0.0      # fractional frame index
+    lastTick = None
+
+    def reset(self, position=0.0):
+        self.position = float(position)
+        self.lastTick = None
+
+    def start(self):
+        self.lastTick = time.perf_counter()
+
+    def stop(self):
+        self.lastTick = None
+
+    # Advances by elapsed wall time * fastRatio; frames are skipped when ticks arrive late
+    def advance(self, frameTime, fastRatio):
+        now = time.perf_counter()
+        if self.lastTick is not None and frameTime > 0:
+            self.position += (now - self.lastTick) / frameTime * fastRatio
+        self.lastTick = now
+        return self.position
+
+    def wrap(self, frames):
+        if frames > 0:
+            self.position %= frames
+        return self.position
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Evaluated pose cache
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# World-space points of whole frames for actors evaluated on demand, keyed by
+# (actor, frame) and evicted least recently used first. A background thread
+# fills the frames ahead of the playhead in the current playback direction.
+class PoseCache:
+    maxBytes = 256 * 1024 * 1024
+    prefetchFrames = 64
+    prefetchBlock = 16      # frames evaluated per forward kinematics call
+
+    def __init__(self, maxBytes=None):
+        if maxBytes is not None:
+            self.maxBytes = maxBytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Condition()
+        self.requests = OrderedDict()      # actor -> (frame, direction), latest request per actor
+        self.thread = None
+        self.fStop = False
+        self.generation = 0     # bumped when actors are dropped, so in-flight results for them are discarded
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, actor, frame):
+        with self.lock:
+            pose = self.entries.get((actor, frame))
+            if pose is not None:
+                self.entries.move_to_end((actor, frame))
+            return pose
+
+    def put(self, actor, frame, pose):
+        pose = np.asarray(pose, dtype=np.float32)
+        with self.lock:
+            previous = self.entries.pop((actor, frame), None)
+            if previous is not None:
+                self.bytes -= previous.nbytes
+            self.entries[(actor, frame)] = pose
+            self.bytes += pose.nbytes
+            while (self.bytes > self.maxBytes) and (len(self.entries) > 1):
+                self.bytes -= self.entries.popitem(last=False)[1].nbytes
+
+    # Drops every entry (e.g. when the scene is replaced)
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.requests.clear()
+            self.bytes = 0
+            self.generation += 1
+
+    # Drops one actor's entries and requests (e.g. before its motion is closed)
+    def discard(self, actor):
+        with self.lock:
+            self.requests.pop(actor, None)
+            for key in [key for key in self.entries if key[0] is actor]:
+                self.bytes -= self.entries.pop(key).nbytes
+            self.generation += 1
+
+    def prefetch(self, actor, frame, direction):
+        with self.lock:
+            self.requests[actor] = (frame, 1 if direction >= 0 else -1)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+            self.lock.notify()
+
+    def stop(self):
+        with self.lock:
+            self.fStop = True
+            self.lock.notify()
+            thread = self.thread
+        if thread is not None:
+            thread.join()
+
+    def run(self):
+        try:
+            while True:
+                with self.lock:
+                    while (len(self.requests) == 0) and not self.fStop:
+                        self.lock.wait()
+                    if self.fStop:
+                        return
+                    actor, (frame, direction) = self.requests.popitem(last=False)
+                    generation = self.generation
+                try:
+                    self.fill(actor, frame, direction, generation)
+                except Exception:   # e.g. the motion was closed while it was read; prefetching is best effort
+                    pass
+        finally:
+            with self.lock:
+                self.thread = None
+
+    def fill(self, actor, frame, direction, generation):
+        with self.lock:
+            available = actor.availableFrames()
+            ahead = [(frame + direction * k) % available for k in range(1, min(self.prefetchFrames, available) + 1)]
+            missing = [f for f in ahead if (actor, f) not in self.entries]
+
+        for begin in range(0, len(missing), self.prefetchBlock):
+            block = missing[begin:begin + self.prefetchBlock]
+            poses = actor.kinematics.jointPositions(actor.motion[np.array(block)])
+            with self.lock:
+                if generation != self.generation:   # the actor may have been dropped meanwhile
+                    return
+                for f, pose in zip(block, poses):
+                    self.put(actor, f, pose)
+                if self.fStop or (actor in self.requests):     # the playhead moved on; start over from there
+                    return
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" World-space joint position export
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import os
+import json
+import numpy as np
+
+from python_bvh import BVHNode
+from Kinematics import ForwardKinematics, matrixToQuaternion
+
+positionFormats = {"npy": ".npy", "parquet": ".parquet", "csv": ".csv"}
+
+# "frame", then x/y/z per joint and end site, then (optionally) the world rotation
+# of each joint as a w/x/y/z quaternion
+def positionColumns(kinematics:ForwardKinematics, fRotations=False):
+    skeleton = kinematics.skeleton
+    points = skeleton.names + [skeleton.names[joint] + "_End" for joint in skeleton.siteJoints]
+    names = ["frame"] + [name + "_" + axis for name in points for axis in "xyz"]
+    if fRotations:
+        names += [name + "_q" + axis for name in skeleton.names for axis in "wxyz"]
+    return names
+
+# Frames [begin, end) are evaluated and written chunkFrames at a time, so memory
+# stays bounded by the chunk, not the capture
+def exportPositions(dstFilePath, root:BVHNode, motion, begin=0, end=None, fileFormat="npy", fRotations=False, chunkFrames=4096):
+    end = len(motion) if end is None else end
+    if not 0 <= begin < end <= len(motion):
+        raise ValueError("invalid frame range " + str(begin) + "-" + str(end))
+    kinematics = ForwardKinematics(root)
+    names = positionColumns(kinematics, fRotations)
+    sink = {"npy": NPYSink, "parquet": ParquetSink, "csv": CSVSink}[fileFormat](dstFilePath, names, end - begin)
+    try:
+        for first in range(begin, end, chunkFrames):
+            last = min(first + chunkFrames, end)
+            points, rotation = kinematics.worldPoses(motion[first:last])
+            block = np.empty((last - first, len(names)), dtype=np.float32)
+            block[:, 0] = np.arange(first, last)
+            block[:, 1:1 + points.shape[1] * 3] = points.reshape(len(block), -1)
+            if fRotations:
+                block[:, 1 + points.shape[1] * 3:] = matrixToQuaternion(rotation).reshape(len(block), -1)
+            sink.write(block)
+    finally:
+        sink.close()
+
+
+## Column sinks
+# A (frames, columns) float32 .npy written in place, column names in <name>.columns.json
+class NPYSink:
+    def __init__(self, dstFilePath, names, frames):
+        self.out = np.lib.format.open_memmap(dstFilePath, mode="w+", dtype=np.float32, shape=(frames, len(names)))
+        self.row = 0
+        with open(os.path.splitext(dstFilePath)[0] + ".columns.json", "w") as f:
+            json.dump(names, f)
+
+    def write(self, block):
+        self.out[self.row:self.row + len(block)] = block
+        self.row += len(block)
+
+    def close(self):
+        self.out.flush()
+        self.out = None
+
+class CSVSink:
+    def __init__(self, dstFilePath, names, frames):
+        self.f = open(dstFilePath, "w", newline="")
+        self.f.write(",".join(names) + "\n")
+        self.fmt = ["%d"] + ["%.6f"] * (len(names) - 1)
+
+    def write(self, block):
+        np.savetxt(self.f, block, fmt=self.fmt, delimiter=",")
+
+    def close(self):
+        self.f.close()
+
+# One row group per chunk; needs pyarrow
+class ParquetSink:
+    def __init__(self, dstFilePath, names, frames):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Parquet export needs the pyarrow package")
+        self.pa = pyarrow
+        self.names = names
+        fields = [pyarrow.field(names[0], pyarrow.int64())] + [pyarrow.field(name, pyarrow.float32()) for name in names[1:]]
+        self.schema = pyarrow.schema(fields)
+        self.writer = pyarrow.parquet.ParquetWriter(dstFilePath, self.schema)
+
+    def write(self, block):
+        columns = [self.pa.array(block[:, 0].astype(np.int64))] + [self.pa.array(block[:, i]) for i in range(1, block.shape[1])]
+        self.writer.write_table(self.pa.Table.from_arrays(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
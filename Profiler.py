@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Render loop instrumentation
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import json
+import time
+from contextlib import nullcontext
+from collections import deque, OrderedDict
+import numpy as np
+
+_nullStage = nullcontext()
+
+class _Stage:
+    __slots__ = ("profiler", "name", "begin")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.begin = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.begin, time.perf_counter())
+
+
+# Rolling per-stage timings and frame intervals, plus a bounded event list that
+# can be saved as a Chrome trace (chrome://tracing, Perfetto). While disabled,
+# stage() hands back a shared no-op context and nothing is recorded.
+class FrameProfiler:
+    enabled = False
+    historyFrames = 600
+    traceEvents = 200000
+    expectedInterval = 1.0 / 60.0    # seconds; longer than 1.5x this counts as a dropped frame
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.stages = OrderedDict()
+        self.frameTimes = deque(maxlen=self.historyFrames)
+        self.events = deque(maxlen=self.traceEvents)
+        self.lastFrame = None
+        self.paintEnd = None
+        self.dropped = 0
+        self.origin = time.perf_counter()
+
+    def setEnabled(self, fEnable):
+        if fEnable and not self.enabled:
+            self.reset()
+        self.enabled = fEnable
+
+    def stage(self, name):
+        return _Stage(self, name) if self.enabled else _nullStage
+
+    def record(self, name, begin, end):
+        samples = self.stages.get(name)
+        if samples is None:
+            samples = self.stages[name] = deque(maxlen=self.historyFrames)
+        samples.append(end - begin)
+        self.events.append((name, begin, end - begin))
+
+    # Called at the start of every repaint
+    def frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.lastFrame is not None:
+            interval = now - self.lastFrame
+            self.frameTimes.append(interval)
+            if interval > 1.5 * self.expectedInterval:
+                self.dropped += 1
+            self.events.append(("frame", self.lastFrame, interval))
+        self.lastFrame = now
+
+    # Repaint finished / buffers swapped: the gap is the swap (and compositor) time
+    def painted(self):
+        if self.enabled:
+            self.paintEnd = time.perf_counter()
+
+    def swapped(self):
+        if self.enabled and (self.paintEnd is not None):
+            self.record("swap", self.paintEnd, time.perf_counter())
+            self.paintEnd = None
+
+    def statistics(self):
+        result = OrderedDict()
+        if len(self.frameTimes) != 0:
+            p50, p95, p99 = np.percentile(np.array(self.frameTimes) * 1e3, (50, 95, 99))
+            result["frame"] = {"p50": p50, "p95": p95, "p99": p99, "dropped": self.dropped}
+        for name, samples in self.stages.items():
+            if len(samples) != 0:
+                values = np.array(samples) * 1e3
+                result[name] = {"mean": values.mean(), "p95": np.percentile(values, 95)}
+        return result
+
+    def overlayLines(self):
+        lines = []
+        for name, values in self.statistics().items():
+            if name == "frame":
+                lines.append("frame  p50 %6.2f  p95 %6.2f  p99 %6.2f ms  dropped %d" %
+                             (values["p50"], values["p95"], values["p99"], values["dropped"]))
+            else:
+                lines.append("%-6s mean %6.3f  p95 %6.3f ms" % (name, values["mean"], values["p95"]))
+        return lines
+
+    def saveTrace(self, filePath):
+        events = [{"name": name, "cat": "frame" if name == "frame" else "stage", "ph": "X", "pid": 1, "tid": 1 if name == "frame" else 2,
+                   "ts": (begin - self.origin) * 1e6, "dur": duration * 1e6} for name, begin, duration in list(self.events)]
+        with open(filePath, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
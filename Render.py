@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Offscreen video / image sequence renderer
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+# usage: python Render.py motion.bvh [more.bvh ...] -o frames/ [--size 640 480] [--step 10] [-j 8]
+#        python Render.py motion.bvh -o preview.mp4 [--fps 30] [--ffmpeg ffmpeg]
+#
+# The scene is the player's own (GLWidget.drawScene): floor, actors and camera.
+# Frames are drawn into an offscreen framebuffer, read back through two
+# alternating pixel-pack buffers and handed to a pool of PNG encoder processes,
+# or piped as raw RGBA into ffmpeg when the output is a video file.
+# Runs headless: QT_QPA_PLATFORM defaults to "offscreen", --gl osmesa needs no GPU.
+
+import os
+import sys
+import zlib
+import queue
+import struct
+import ctypes
+import argparse
+import threading
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+videoFormats = (".mp4", ".mov", ".mkv", ".avi", ".webm", ".gif")
+
+def createContext(backend, width, height):
+    if backend == "osmesa":
+        from OpenGL import osmesa, arrays
+        from OpenGL.GL import GL_UNSIGNED_BYTE
+        context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        buffer = arrays.GLubyteArray.zeros((height, width, 4))
+        if not osmesa.OSMesaMakeCurrent(context, buffer, GL_UNSIGNED_BYTE, width, height):
+            raise RuntimeError("OSMesaMakeCurrent failed")
+        return (context, buffer)
+
+    from PyQt5.Qt import QGuiApplication, QOffscreenSurface, QOpenGLContext, QOpenGLFramebufferObject
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    surface = QOffscreenSurface()
+    surface.create()
+    context = QOpenGLContext()
+    if not context.create() or not context.makeCurrent(surface):
+        raise RuntimeError("could not create an offscreen OpenGL context")
+    fbo = QOpenGLFramebufferObject(width, height, QOpenGLFramebufferObject.Depth)
+    fbo.bind()
+    return (app, surface, context, fbo)
+
+# Frame N is read into one pixel-pack buffer while frame N-1 is mapped from the
+# other, so the GPU copy overlaps drawing. Falls back to plain glReadPixels.
+class FrameReader:
+    def __init__(self, width, height):
+        from OpenGL.GL import glGenBuffers, glBindBuffer, glBufferData, GL_PIXEL_PACK_BUFFER, GL_STREAM_READ
+        self.width = width
+        self.height = height
+        self.size = width * height * 4
+        self.count = 0
+        self.pending = None     # (buffer index, tag) still on the GPU
+        try:
+            self.buffers = glGenBuffers(2)
+            for buffer in self.buffers:
+                glBindBuffer(GL_PIXEL_PACK_BUFFER, buffer)
+                glBufferData(GL_PIXEL_PACK_BUFFER, self.size, None, GL_STREAM_READ)
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        except Exception:
+            self.buffers = None
+
+    # Starts reading the current framebuffer; returns the (tag, RGBA bytes) now complete
+    def read(self, tag):
+        from OpenGL.GL import glReadPixels, glBindBuffer, GL_PIXEL_PACK_BUFFER, GL_RGBA, GL_UNSIGNED_BYTE
+        from OpenGL.raw.GL.VERSION.GL_1_0 import glReadPixels as readPixelsInto
+        if self.buffers is None:
+            data = glReadPixels(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE)
+            return [(tag, data if isinstance(data, bytes) else np.ascontiguousarray(data, dtype=np.uint8).tobytes())]
+
+        index = self.count % 2
+        self.count += 1
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self.buffers[index])
+        readPixelsInto(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        ready = self.finish()
+        self.pending = (index, tag)
+        return ready
+
+    def finish(self):
+        from OpenGL.GL import glBindBuffer, glMapBuffer, glUnmapBuffer, GL_PIXEL_PACK_BUFFER, GL_READ_ONLY
+        if self.pending is None:
+            return []
+        index, tag = self.pending
+        self.pending = None
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self.buffers[index])
+        pointer = glMapBuffer(GL_PIXEL_PACK_BUFFER, GL_READ_ONLY)
+        data = ctypes.string_at(pointer, self.size)
+        glUnmapBuffer(GL_PIXEL_PACK_BUFFER)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        return [(tag, data)]
+
+
+## Frame sinks
+def encodePNG(filePath, data, width, height, level=6):
+    pixels = np.frombuffer(data, dtype=np.uint8).reshape(height, width, 4)[::-1, :, :3]    # GL rows are bottom-up
+    raw = np.concatenate((np.zeros((height, 1), dtype=np.uint8), pixels.reshape(height, -1)), axis=1)
+
+    def chunk(tag, body):
+        return struct.pack(">I", len(body)) + tag + body + struct.pack(">I", zlib.crc32(tag + body) & 0xffffffff)
+    with open(filePath, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), level)))
+        f.write(chunk(b"IEND", b""))
+    return filePath
+
+class PNGSequence:
+    def __init__(self, outputDir, width, height, jobs=None, prefix="frame_", level=6):
+        os.makedirs(outputDir, exist_ok=True)
+        self.outputDir = outputDir
+        self.width = width
+        self.height = height
+        self.prefix = prefix
+        self.level = level
+        jobs = jobs or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(jobs)
+        self.maxPending = 2 * jobs
+        self.pending = []
+
+    def write(self, frame, data):
+        filePath = os.path.join(self.outputDir, self.prefix + "%06d.png" % frame)
+        self.pending.append(self.pool.submit(encodePNG, filePath, data, self.width, self.height, self.level))
+        while len(self.pending) > self.maxPending:    # keep memory bounded when encoding falls behind
+            self.pending.pop(0).result()
+
+    def close(self):
+        try:
+            for future in self.pending:
+                future.result()
+        finally:
+            self.pool.shutdown()
+
+# Raw RGBA into a local ffmpeg; a feeder thread keeps the pipe busy while drawing continues
+class FFmpegPipe:
+    def __init__(self, outputPath, width, height, fps, ffmpeg="ffmpeg"):
+        command = [ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgba",
+                   "-s", str(width) + "x" + str(height), "-r", repr(float(fps)), "-i", "-", "-vf", "vflip"]
+        if not outputPath.lower().endswith(".gif"):
+            command += ["-pix_fmt", "yuv420p"]
+        self.process = subprocess.Popen(command + [outputPath], stdin=subprocess.PIPE)
+        self.queue = queue.Queue(maxsize=8)
+        self.error = None
+        self.thread = threading.Thread(target=self.feed, daemon=True)
+        self.thread.start()
+
+    def feed(self):
+        while True:
+            data = self.queue.get()
+            if data is None:
+                break
+            try:
+                self.process.stdin.write(data)
+            except OSError as e:
+                self.error = e
+                break
+
+    def write(self, frame, data):
+        if self.error is not None:
+            raise RuntimeError("ffmpeg stopped accepting frames: " + str(self.error))
+        self.queue.put(data)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError("ffmpeg exited with code " + str(self.process.returncode))
+
+
+## Rendering
+def framePositions(frames, frameTime, fps=None, begin=0, end=None, step=1):
+    # Fractional source frames for every output frame; resampled when fps differs from the motion
+    end = frames if end is None else min(end, frames)
+    stride = 1.0 if fps is None else 1.0 / (fps * frameTime)
+    return np.arange(begin, end, stride * step)
+
+def render(filePaths, output, width=640, height=480, fps=None, begin=0, end=None, step=1, camera=None,
+           backend="qt", jobs=None, ffmpeg="ffmpeg", motionCache=None):
+    from PyQt5.Qt import QApplication
+    from OpenGL.GL import glViewport
+    from BVHStream import readMotion
+    from GLWidget import GLWidget
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    contextRefs = createContext(backend, width, height)
+    widget = GLWidget()
+    widget.initializeGL()
+    glViewport(0, 0, width, height)
+    for filePath in filePaths:
+        root, motion, frames, frameTime = readMotion(filePath, motionCache)
+        widget.addActor(root, motion, frames, frameTime, os.path.basename(filePath))
+    widget.isPlaying = False
+    for name, value in (camera or {}).items():
+        setattr(widget, name, value)
+
+    positions = framePositions(widget.frames, widget.frameTime, fps, begin, end, step)
+    if os.path.splitext(output)[1].lower() in videoFormats:
+        # every output frame advances step frames of the chosen rate, so the video plays in real time
+        rate = (fps if fps is not None else 1.0 / widget.frameTime) / step
+        sink = FFmpegPipe(output, width, height, rate, ffmpeg)
+    else:
+        sink = PNGSequence(output, width, height, jobs)
+    reader = FrameReader(width, height)
+    try:
+        for k, position in enumerate(positions):
+            widget.drawScene(float(width) / float(height), position)
+            for tag, data in reader.read(k):
+                sink.write(tag, data)
+        for tag, data in reader.finish():
+            sink.write(tag, data)
+    finally:
+        sink.close()
+        del contextRefs
+    return len(positions)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render BVH motions offscreen to a PNG sequence or a video.")
+    parser.add_argument("files", nargs="+", help="BVH files; the first one drives the timing, the rest are added as actors")
+    parser.add_argument("-o", "--output", required=True, help="output folder for PNGs, or a video file (" + ", ".join(videoFormats) + ")")
+    parser.add_argument("--size", type=int, nargs=2, default=[640, 480], metavar=("W", "H"), help="frame size")
+    parser.add_argument("--fps", type=float, help="output frame rate (default: the motion's own)")
+    parser.add_argument("--begin", type=int, default=0, help="first source frame")
+    parser.add_argument("--end", type=int, help="source frame to stop before")
+    parser.add_argument("--step", type=int, default=1, help="render every n-th output frame (thumbnails)")
+    parser.add_argument("--cam-dist", type=float, default=500.0, help="camera distance")
+    parser.add_argument("--rotate-xz", type=float, default=0.0, help="camera rotation around the vertical axis")
+    parser.add_argument("--rotate-y", type=float, default=45.0, help="camera elevation")
+    parser.add_argument("--gl", choices=("qt", "osmesa"), default="qt", help="offscreen GL backend")
+    parser.add_argument("-j", "--jobs", type=int, help="PNG encoder processes (default: CPU count)")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg executable for video output")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the parse cache")
+    args = parser.parse_args(argv)
+
+    if args.gl == "osmesa":
+        os.environ["PYOPENGL_PLATFORM"] = "osmesa"    # must be set before OpenGL is imported
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from MotionCache import MotionCache
+    motionCache = MotionCache()
+    motionCache.enabled = not args.no_cache
+
+    camera = {"camDist": args.cam_dist, "rotateXZ": args.rotate_xz, "rotateY": args.rotate_y}
+    try:
+        count = render(args.files, args.output, args.size[0], args.size[1], args.fps, args.begin, args.end, args.step,
+                       camera, args.gl, args.jobs, args.ffmpeg, motionCache)
+    except (OSError, ValueError, RuntimeError) as e:
+        print("error: " + str(e), file=sys.stderr)
+        return 1
+    print(str(count) + " frames written to " + args.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Frame rate conversion
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import numpy as np
+
+from python_bvh import BVHNode
+from Kinematics import ForwardKinematics, quaternionToMatrix, slerp
+
+# Frame count of a motion of the given length after conversion; both ends are kept
+def resampledFrames(frames, frameTime, targetFrameTime):
+    if frames < 2:
+        return frames
+    return int(np.floor((frames - 1) * frameTime / targetFrameTime + 1e-6)) + 1
+
+# Joints with three rotation channels are interpolated as quaternions (slerp) and
+# written back as Euler angles in their own channel order; position channels and
+# joints with fewer rotation channels are interpolated linearly.
+def resampleMotion(root:BVHNode, motion, frameTime, targetFrameTime, chunkFrames=4096):
+    kinematics = ForwardKinematics(root)
+    frames = len(motion)
+    outFrames = resampledFrames(frames, frameTime, targetFrameTime)
+    result = np.empty((outFrames, motion.shape[1]), dtype=np.float64)
+    skeleton = kinematics.skeleton
+    fullJoints = np.flatnonzero((skeleton.rotationColumns >= 0).all(axis=1))
+    fullJoints = fullJoints[[len(set(np.argmax(np.abs(skeleton.rotationAxes[j]), axis=1))) == 3 for j in fullJoints]]
+    orders = np.argmax(np.abs(skeleton.rotationAxes[fullJoints]), axis=2)     # (joints, 3) axis index per slot
+    columns = skeleton.rotationColumns[fullJoints]
+
+    for begin in range(0, outFrames, chunkFrames):
+        end = min(begin + chunkFrames, outFrames)
+        position = np.arange(begin, end) * (targetFrameTime / frameTime)
+        i0 = np.minimum(np.floor(position).astype(np.int64), frames - 1)
+        i1 = np.minimum(i0 + 1, frames - 1)
+        t = position - i0
+        first, last = i0[0], i1[-1] + 1
+        rows = np.asarray(motion[first:last], dtype=np.float64)
+        r0, r1 = rows[i0 - first], rows[i1 - first]
+        block = r0 + (r1 - r0) * t[:, None]
+        if len(fullJoints) != 0:
+            # Only the source frames that bracket an output frame are converted
+            needed, inverse = np.unique(np.concatenate((i0, i1)) - first, return_inverse=True)
+            quaternions = kinematics.localQuaternions(rows[needed])[:, fullJoints]
+            q = slerp(quaternions[inverse[:len(i0)]], quaternions[inverse[len(i0):]], t[:, None])
+            angles = _eulerAngles(quaternionToMatrix(q), orders)
+            block[:, columns] = _nearestAngles(angles, orders, block[:, columns])
+        result[begin:end] = block
+    return result
+
+
+## Support Functions
+def _eulerAngles(rotation, orders):
+    # R = R_a(alpha) R_b(beta) R_c(gamma) for the axis indices (a, b, c) of each joint, in degrees
+    a, b, c = orders[:, 0], orders[:, 1], orders[:, 2]
+    sign = np.where((b - a) % 3 == 1, 1.0, -1.0)   # +1 for cyclic orders such as XYZ or ZXY
+    joints = np.arange(len(orders))
+    element = lambda row, column: rotation[:, joints, row, column]
+    beta = np.arcsin(np.clip(sign * element(a, c), -1.0, 1.0))
+    alpha = np.arctan2(-sign * element(b, c), element(c, c))
+    gamma = np.arctan2(-sign * element(a, b), element(a, a))
+    return np.degrees(np.stack((alpha, beta, gamma), axis=-1))
+
+def _nearestAngles(angles, orders, reference):
+    # Of the two Euler solutions, each shifted by whole turns, the one closest to
+    # the linearly interpolated source angles, so the channels stay continuous
+    other = np.stack((angles[..., 0] + 180.0, 180.0 - angles[..., 1], angles[..., 2] + 180.0), axis=-1)
+    best, bestError = None, None
+    for candidate in (angles, other):
+        candidate = candidate + 360.0 * np.round((reference - candidate) / 360.0)
+        error = np.abs(candidate - reference).sum(axis=-1, keepdims=True)
+        if best is None:
+            best, bestError = candidate, error
+        else:
+            best = np.where(error < bestError, candidate, best)
+            bestError = np.minimum(error, bestError)
+    return best
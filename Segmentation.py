@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Automatic split proposals
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import numpy as np
+
+from Kinematics import ForwardKinematics
+from MotionEnergy import motionEnergy
+
+# Thresholds for proposeSplits; speeds are mean joint speeds in skeleton units per second
+class SplitSettings:
+    smoothSeconds = 0.25    # moving average applied to the speed curve
+    restRatio = 0.1         # rest when below this fraction of the 95th percentile speed ...
+    restSpeed = None        # ... or below this absolute speed, when given
+    tposeDegrees = 10.0     # mean |rotation| of non-root joints for a T-pose (the BVH rest pose)
+    minSeconds = 1.0        # shorter active stretches are dropped
+    minGapSeconds = 0.3     # shorter pauses inside a movement are bridged
+
+# Rest frames (slow), T-pose frames (near-zero joint rotations) and the active
+# stretches between them. The motion (an array or LazyMotion) is read in chunks,
+# and only its rotation columns for the T-pose test.
+def analyzeMotion(kinematics:ForwardKinematics, motion, frameTime, positions=None, settings=SplitSettings,
+                  chunkFrames=4096, isCancelled=None):
+    frames = len(motion)
+    speed = motionEnergy(kinematics, motion, frameTime, positions, chunkFrames, isCancelled)
+    window = max(1, int(round(settings.smoothSeconds / frameTime)))
+    smoothed = _movingAverage(speed, window)
+
+    restSpeed = settings.restSpeed
+    if restSpeed is None:
+        restSpeed = settings.restRatio * np.percentile(smoothed, 95) if frames > 0 else 0.0
+    rest = smoothed < restSpeed
+
+    columns = kinematics.rotationColumns[1:]
+    columns = columns[columns >= 0]
+    tpose = np.zeros(frames, dtype=bool)
+    if len(columns) != 0:
+        for begin in range(0, frames, chunkFrames):
+            if (isCancelled is not None) and isCancelled():
+                raise InterruptedError
+            end = min(begin + chunkFrames, frames)
+            angles = np.asarray(motion[begin:end], dtype=np.float64)[:, columns]
+            tpose[begin:end] = np.abs(_wrapDegrees(angles)).mean(axis=1) < settings.tposeDegrees
+    return speed, rest, tpose
+
+# Candidate (begin, end) pairs, end exclusive as in exportSegment
+def proposeSplits(kinematics:ForwardKinematics, motion, frameTime, positions=None, settings=SplitSettings, isCancelled=None):
+    speed, rest, tpose = analyzeMotion(kinematics, motion, frameTime, positions, settings, isCancelled=isCancelled)
+    active = ~(rest | tpose)
+
+    # Bridge short pauses, then drop short movements
+    minGap = int(round(settings.minGapSeconds / frameTime))
+    begins, ends = _runs(~active)
+    inner = (begins > 0) & (ends < len(active)) & (ends - begins < minGap)
+    for begin, end in zip(begins[inner], ends[inner]):
+        active[begin:end] = True
+    begins, ends = _runs(active)
+    keep = ends - begins >= max(1, int(round(settings.minSeconds / frameTime)))
+    return list(zip(begins[keep].tolist(), ends[keep].tolist()))
+
+
+## Support Functions
+def _runs(mask):
+    # Half-open [begin, end) ranges of consecutive True values
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+def _movingAverage(values, window):
+    if (window <= 1) or (len(values) == 0):
+        return values
+    padded = np.concatenate((np.full(window // 2, values[0]), values, np.full(window - 1 - window // 2, values[-1])))
+    total = np.cumsum(np.concatenate(([0.0], padded)))
+    return (total[window:] - total[:-window]) / window
+
+def _wrapDegrees(angles):
+    return (angles + 180.0) % 360.0 - 180.0
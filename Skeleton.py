@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Flattened skeleton topology
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import weakref
+import numpy as np
+
+from python_bvh import BVHNode
+
+# Channel kinds in channelTypes
+POSITION = 0
+ROTATION = 1
+UNKNOWN = -1
+
+# A BVHNode tree compiled once into flat arrays in pre-order (a parent always
+# precedes its children). Joint j owns channels channelStarts[j]:channelStarts[j+1];
+# channel c reads motion column channelColumns[c] as channelTypes[c] about channelAxes[c].
+class Skeleton:
+    def __init__(self, root:BVHNode):
+        nodes = []
+        parents = []
+        stack = [(root, -1)]
+        while len(stack) != 0:
+            node, parent = stack.pop()
+            parents.append(parent)
+            nodes.append(node)
+            index = len(nodes) - 1
+            for child in reversed(node.childNode):
+                stack.append((child, index))
+        numJoints = len(nodes)
+
+        self.names = [node.nodeName for node in nodes]
+        self.parents = np.array(parents, dtype=np.int64)
+        self.depth = np.zeros(numJoints, dtype=np.int64)
+        for i in range(1, numJoints):
+            self.depth[i] = self.depth[self.parents[i]] + 1
+        self.levels = [np.flatnonzero(self.depth == d) for d in range(1, self.depth.max() + 1)] if numJoints > 1 else []
+
+        self.offsets = np.array([node.offset for node in nodes], dtype=np.float64).reshape(numJoints, 3)
+        self.siteJoints = np.array([i for i, node in enumerate(nodes) if node.fHaveSite], dtype=np.int64)
+        self.siteOffsets = np.array([nodes[i].site for i in self.siteJoints], dtype=np.float64).reshape(-1, 3)
+        self.siteIndex = np.full(numJoints, -1, dtype=np.int64)     # joint -> row of siteOffsets
+        self.siteIndex[self.siteJoints] = np.arange(len(self.siteJoints))
+
+        # Channel dispatch table, decoded from the labels once
+        self.channelLabels = [label for node in nodes for label in node.chLabel]
+        self.channelStarts = np.cumsum([0] + [len(node.chLabel) for node in nodes]).astype(np.int64)
+        self.channelJoints = np.repeat(np.arange(numJoints), np.diff(self.channelStarts))
+        self.channelColumns = np.array([node.frameIndex + j for node in nodes for j in range(len(node.chLabel))], dtype=np.int64)
+        kinds = [_channelKind(label) for label in self.channelLabels]
+        self.channelTypes = np.array([kind for kind, _ in kinds], dtype=np.int64)
+        self.channelAxes = np.array([axis for _, axis in kinds], dtype=np.int64)
+
+        # Per joint views of the table: columns, -1 where the channel is absent
+        self.positionColumns = np.full((numJoints, 3), -1, dtype=np.int64)
+        self.rotationColumns = np.full((numJoints, 3), -1, dtype=np.int64)
+        self.rotationAxes = np.zeros((numJoints, 3, 3), dtype=np.float64)
+        slots = np.zeros(numJoints, dtype=np.int64)
+        for joint, kind, axis, column in zip(self.channelJoints, self.channelTypes, self.channelAxes, self.channelColumns):
+            if kind == POSITION:
+                self.positionColumns[joint, axis] = column
+            elif (kind == ROTATION) and (slots[joint] < 3):
+                self.rotationColumns[joint, slots[joint]] = column
+                self.rotationAxes[joint, slots[joint], axis] = 1.0
+                slots[joint] += 1
+        self.hasPosition = np.any(self.positionColumns >= 0, axis=1)
+
+        # Bones as (from, to) point indices: joints first, then end sites
+        bones = [(self.parents[i], i) for i in range(1, numJoints)]
+        bones += [(joint, numJoints + k) for k, joint in enumerate(self.siteJoints)]
+        self.bones = np.array(bones, dtype=np.int64).reshape(-1, 2)
+
+        # Skeletons with equal keys can be evaluated together (offsets may differ)
+        self.topologyKey = (self.parents.tobytes(), self.positionColumns.tobytes(), self.rotationColumns.tobytes(),
+                            self.rotationAxes.tobytes(), self.siteJoints.tobytes())
+
+    @property
+    def numJoints(self):
+        return len(self.parents)
+
+    @property
+    def numPoints(self):
+        return len(self.parents) + len(self.siteJoints)
+
+    @property
+    def numChannels(self):
+        return len(self.channelLabels)
+
+    def jointChannels(self, joint):
+        return self.channelLabels[self.channelStarts[joint]:self.channelStarts[joint + 1]]
+
+    def children(self, joint):
+        return np.flatnonzero(self.parents == joint)
+
+
+_compiled = weakref.WeakKeyDictionary()
+
+# Shared compiled form of a tree, so the renderer, writers and analysis build it once
+def compileSkeleton(root):
+    if isinstance(root, Skeleton):
+        return root
+    try:
+        skeleton = _compiled.get(root)
+    except TypeError:      # node type without weak references
+        return Skeleton(root)
+    if skeleton is None:
+        skeleton = Skeleton(root)
+        _compiled[root] = skeleton
+    return skeleton
+
+
+## Support Functions
+def _channelKind(label):
+    for axis, name in enumerate("XYZ"):
+        if name + "position" in label:
+            return POSITION, axis
+        elif name + "rotation" in label:
+            return ROTATION, axis
+    return UNKNOWN, 0
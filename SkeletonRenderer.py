@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Instanced skeleton drawing
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import ctypes
+import numpy as np
+
+from OpenGL.GL import *
+from OpenGL.GL import shaders
+from OpenGL.GLU import *
+
+_vertexShader = """
+#version 120
+attribute vec3 position;
+attribute vec4 instanceColumn0;
+attribute vec4 instanceColumn1;
+attribute vec4 instanceColumn2;
+attribute vec4 instanceColumn3;
+attribute vec4 instanceColor;
+varying vec4 color;
+
+void main()
+{
+    mat4 model = mat4(instanceColumn0, instanceColumn1, instanceColumn2, instanceColumn3);
+    gl_Position = gl_ModelViewProjectionMatrix * model * vec4(position, 1.0);
+    color = instanceColor;
+}
+"""
+
+_fragmentShader = """
+#version 120
+varying vec4 color;
+
+void main()
+{
+    gl_FragColor = color;
+}
+"""
+
+# Instanced path when the context supports it, GLU quadrics otherwise. Each bone
+# and joint gets a tessellation level from its projected size; below the last
+# level (or when the triangle budget runs out) it is drawn as a line / point.
+class SkeletonRenderer:
+    isAvailable = False
+    useInstancing = True
+    useLOD = True
+    boneRadius = 1.5
+    jointRadius = 3.0
+    lodLevels = ((8, 16, 16), (6, 10, 8), (4, 6, 4))    # (bone slices, joint slices, joint stacks), finest first
+    lodPixels = (16.0, 4.0, 1.5)    # smallest projected diameter (pixels) drawn at each level
+    triangleBudget = 200000
+    pointSize = 3.0
+
+    def __init__(self):
+        self.program = None
+        self.meshes = {}
+        self.instanceBuffer = None
+        self.quadObj = None
+
+    # Must be called with the GL context current (e.g. from initializeGL)
+    def initialize(self):
+        self.isAvailable = False
+        self.quadObj = gluNewQuadric()
+        try:
+            if not (bool(glDrawElementsInstanced) and bool(glVertexAttribDivisor)):
+                return False
+            self.program = shaders.compileProgram(shaders.compileShader(_vertexShader, GL_VERTEX_SHADER),
+                                                  shaders.compileShader(_fragmentShader, GL_FRAGMENT_SHADER))
+            self.positionLocation = glGetAttribLocation(self.program, "position")
+            self.columnLocations = [glGetAttribLocation(self.program, "instanceColumn" + str(i)) for i in range(4)]
+            self.colorLocation = glGetAttribLocation(self.program, "instanceColor")
+            for level, (boneSlices, jointSlices, jointStacks) in enumerate(self.lodLevels):
+                self.meshes[("bone", level)] = self._uploadMesh(*cylinderMesh(boneSlices))
+                self.meshes[("joint", level)] = self._uploadMesh(*sphereMesh(jointSlices, jointStacks))
+            self.instanceBuffer = glGenBuffers(1)
+        except Exception:
+            return False
+        self.isAvailable = True
+        return True
+
+    # Colors are a single RGB triple or one triple per bone / joint
+    def draw(self, boneBegin, boneEnd, joints, boneColor, jointColor):
+        boneBegin, boneEnd, joints = [np.asarray(points, dtype=np.float64).reshape(-1, 3) for points in (boneBegin, boneEnd, joints)]
+        boneColors = instanceColors(boneColor, len(boneBegin))
+        jointColors = instanceColors(jointColor, len(joints))
+        boneLevels, jointLevels = self.selectLevels(boneBegin, boneEnd, joints)
+
+        lines = boneLevels == len(self.lodLevels)
+        points = jointLevels == len(self.lodLevels)
+        meshArgs = (boneBegin[~lines], boneEnd[~lines], joints[~points], boneColors[~lines], jointColors[~points],
+                    boneLevels[~lines], jointLevels[~points])
+        if self.useInstancing and self.isAvailable:
+            self.drawInstanced(*meshArgs)
+        else:
+            self.drawImmediate(*meshArgs)
+        self.drawLines(boneBegin[lines], boneEnd[lines], joints[points], boneColors[lines], jointColors[points])
+
+    # Per-instance level from the current matrices, coarsened to fit the triangle budget
+    def selectLevels(self, boneBegin, boneEnd, joints):
+        if not self.useLOD:
+            return np.zeros(len(boneBegin), dtype=np.int64), np.zeros(len(joints), dtype=np.int64)
+        modelview = np.asarray(glGetDoublev(GL_MODELVIEW_MATRIX), dtype=np.float64).reshape(4, 4)
+        projection = np.asarray(glGetDoublev(GL_PROJECTION_MATRIX), dtype=np.float64).reshape(4, 4)
+        focalPixels = 0.5 * projection[1, 1] * glGetIntegerv(GL_VIEWPORT)[3]
+        boneLevels = lodLevel(projectedDiameter(0.5 * (boneBegin + boneEnd), self.boneRadius, modelview, focalPixels), self.lodPixels)
+        jointLevels = lodLevel(projectedDiameter(joints, self.jointRadius, modelview, focalPixels), self.lodPixels)
+        return self.fitBudget(boneLevels, jointLevels)
+
+    def fitBudget(self, boneLevels, jointLevels):
+        boneTriangles = [2 * boneSlices for boneSlices, _, _ in self.lodLevels] + [0]
+        jointTriangles = [2 * jointSlices * jointStacks for _, jointSlices, jointStacks in self.lodLevels] + [0]
+        for level in range(len(self.lodLevels)):
+            if np.take(boneTriangles, boneLevels).sum() + np.take(jointTriangles, jointLevels).sum() <= self.triangleBudget:
+                break
+            boneLevels = np.maximum(boneLevels, level + 1)
+            jointLevels = np.maximum(jointLevels, level + 1)
+        return boneLevels, jointLevels
+
+    def drawImmediate(self, boneBegin, boneEnd, joints, boneColor, jointColor, boneLevels=None, jointLevels=None):
+        quadObj = self.quadObj
+        gluQuadricDrawStyle(quadObj, GLU_FILL)
+        gluQuadricNormals(quadObj, GLU_SMOOTH)
+        if boneLevels is None:
+            boneLevels = np.zeros(len(boneBegin), dtype=np.int64)
+        if jointLevels is None:
+            jointLevels = np.zeros(len(joints), dtype=np.int64)
+
+        # Drawing Links
+        for begin, end, color, level in zip(boneBegin, boneEnd, instanceColors(boneColor, len(boneBegin)), boneLevels):
+            glColor3f(*color)
+            self.renderBone(quadObj, *begin, *end, slices=self.lodLevels[level][0])
+
+        # Drawing Joint Spheres
+        for joint, color, level in zip(joints, instanceColors(jointColor, len(joints)), jointLevels):
+            glColor3f(*color)
+            glPushMatrix()
+            glTranslatef(*joint)
+            gluSphere(quadObj, self.jointRadius, self.lodLevels[level][1], self.lodLevels[level][2])
+            glPopMatrix()
+
+    def renderBone(self, quadObj, x0, y0, z0, x1, y1, z1, slices=None):
+        dir = [x1 - x0, y1 - y0, z1 - z0]
+        boneLength = np.sqrt(dir[0]**2 + dir[1]**2 + dir[2]**2)
+
+        glPushMatrix()
+        glTranslated(x0, y0, z0)
+
+        length = boneLength
+        if length < 0.0001:
+            dir = [0.0, 0.0, 1.0]
+            length = 1.0
+        dir = [data / length for data in dir]
+
+        side = [dir[2], 0.0, -dir[0]]
+        length = np.sqrt(side[0]**2 + side[1]**2 + side[2]**2)
+        if length < 0.0001:
+            side = [1.0, 0.0, 0.0]
+            length = 1.0
+        side = [data / length for data in side]
+
+        up = [dir[1]*side[2] - dir[2]*side[1], dir[2]*side[0] - dir[0]*side[2], dir[0]*side[1] - dir[1]*side[0]]
+        glMultMatrixd((side[0], side[1], side[2], 0.0,
+                         up[0],   up[1],   up[2], 0.0,
+                        dir[0],  dir[1],  dir[2], 0.0,
+                           0.0,     0.0,     0.0, 1.0))
+        gluCylinder(quadObj, self.boneRadius, self.boneRadius, boneLength, slices or self.lodLevels[0][0], 1)
+        glPopMatrix()
+
+    def drawInstanced(self, boneBegin, boneEnd, joints, boneColor, jointColor, boneLevels=None, jointLevels=None):
+        if boneLevels is None:
+            boneLevels = np.zeros(len(boneBegin), dtype=np.int64)
+        if jointLevels is None:
+            jointLevels = np.zeros(len(joints), dtype=np.int64)
+        # Grouped by level so every mesh draws one contiguous run of instances
+        boneOrder = np.argsort(boneLevels, kind="stable")
+        jointOrder = np.argsort(jointLevels, kind="stable")
+        bones = boneInstances(np.asarray(boneBegin)[boneOrder], np.asarray(boneEnd)[boneOrder], self.boneRadius)
+        spheres = jointInstances(np.asarray(joints)[jointOrder], self.jointRadius)
+        if len(bones) + len(spheres) == 0:
+            return
+        # One 80-byte record per instance: the model matrix, then an RGBA color
+        instances = np.ones((len(bones) + len(spheres), 20), dtype=np.float32)
+        instances[:, :16] = np.concatenate((bones, spheres)).reshape(-1, 16)
+        instances[:len(bones), 16:19] = instanceColors(boneColor, len(bones))[boneOrder]
+        instances[len(bones):, 16:19] = instanceColors(jointColor, len(spheres))[jointOrder]
+
+        glUseProgram(self.program)
+        glBindBuffer(GL_ARRAY_BUFFER, self.instanceBuffer)
+        glBufferData(GL_ARRAY_BUFFER, instances.nbytes, instances, GL_STREAM_DRAW)
+        first = 0
+        for name, levels in (("bone", boneLevels), ("joint", jointLevels)):
+            for level in range(len(self.lodLevels)):
+                count = int(np.count_nonzero(levels == level))
+                self._drawInstances(self.meshes[(name, level)], first, count)
+                first += count
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glUseProgram(0)
+
+    # Coarsest level: bones as lines, joints as points, from client-side arrays
+    def drawLines(self, boneBegin, boneEnd, joints, boneColors, jointColors):
+        if len(boneBegin) + len(joints) == 0:
+            return
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        if len(boneBegin) != 0:
+            vertices = np.ascontiguousarray(np.stack((boneBegin, boneEnd), axis=1).reshape(-1, 3), dtype=np.float32)
+            colors = np.ascontiguousarray(np.repeat(boneColors, 2, axis=0), dtype=np.float32)
+            glVertexPointer(3, GL_FLOAT, 0, vertices)
+            glColorPointer(3, GL_FLOAT, 0, colors)
+            glDrawArrays(GL_LINES, 0, len(vertices))
+        if len(joints) != 0:
+            vertices = np.ascontiguousarray(joints, dtype=np.float32)
+            colors = np.ascontiguousarray(jointColors, dtype=np.float32)
+            glPointSize(self.pointSize)
+            glVertexPointer(3, GL_FLOAT, 0, vertices)
+            glColorPointer(3, GL_FLOAT, 0, colors)
+            glDrawArrays(GL_POINTS, 0, len(vertices))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    def _drawInstances(self, mesh, first, count):
+        if count == 0:
+            return
+        vertexBuffer, indexBuffer, indexCount = mesh
+        instanceLocations = self.columnLocations + [self.colorLocation]
+
+        for i, location in enumerate(instanceLocations):
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(location, 4, GL_FLOAT, GL_FALSE, 80, ctypes.c_void_p(first * 80 + i * 16))
+            glVertexAttribDivisor(location, 1)
+
+        glBindBuffer(GL_ARRAY_BUFFER, vertexBuffer)
+        glEnableVertexAttribArray(self.positionLocation)
+        glVertexAttribPointer(self.positionLocation, 3, GL_FLOAT, GL_FALSE, 12, ctypes.c_void_p(0))
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, indexBuffer)
+        glDrawElementsInstanced(GL_TRIANGLES, indexCount, GL_UNSIGNED_INT, None, count)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, self.instanceBuffer)
+
+        glDisableVertexAttribArray(self.positionLocation)
+        for location in instanceLocations:
+            glVertexAttribDivisor(location, 0)
+            glDisableVertexAttribArray(location)
+
+    def _uploadMesh(self, vertices, indices):
+        vertexBuffer, indexBuffer = glGenBuffers(2)
+        glBindBuffer(GL_ARRAY_BUFFER, vertexBuffer)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, indexBuffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        return vertexBuffer, indexBuffer, len(indices)
+
+
+## Instance transforms (column-major 4x4, one per row)
+def boneInstances(begin, end, radius):
+    begin = np.asarray(begin, dtype=np.float64).reshape(-1, 3)
+    direction = np.asarray(end, dtype=np.float64).reshape(-1, 3) - begin
+    boneLength = np.linalg.norm(direction, axis=1)
+
+    # Same basis as renderBone
+    degenerate = boneLength < 0.0001
+    direction[degenerate] = (0.0, 0.0, 1.0)
+    direction /= np.where(degenerate, 1.0, boneLength)[:, None]
+    side = np.stack((direction[:, 2], np.zeros(len(direction)), -direction[:, 0]), axis=1)
+    sideLength = np.linalg.norm(side, axis=1)
+    side[sideLength < 0.0001] = (1.0, 0.0, 0.0)
+    side /= np.where(sideLength < 0.0001, 1.0, sideLength)[:, None]
+    up = np.cross(direction, side)
+
+    result = np.zeros((len(begin), 4, 4), dtype=np.float32)
+    result[:, 0, :3] = side * radius
+    result[:, 1, :3] = up * radius
+    result[:, 2, :3] = direction * boneLength[:, None]
+    result[:, 3, :3] = begin
+    result[:, 3, 3] = 1.0
+    return result
+
+def instanceColors(color, count):
+    return np.broadcast_to(np.asarray(color, dtype=np.float32).reshape(-1, 3), (count, 3))
+
+def jointInstances(points, radius):
+    points = np.asarray(points).reshape(-1, 3)
+    result = np.zeros((len(points), 4, 4), dtype=np.float32)
+    result[:, 0, 0] = radius
+    result[:, 1, 1] = radius
+    result[:, 2, 2] = radius
+    result[:, 3, :3] = points
+    result[:, 3, 3] = 1.0
+    return result
+
+
+## Level of detail
+def projectedDiameter(points, radius, modelview, focalPixels):
+    # modelview as returned by glGetDoublev (column-major); only eye-space depth is needed
+    depth = -(np.asarray(points).reshape(-1, 3) @ modelview[:3, 2] + modelview[3, 2])
+    return 2.0 * radius * focalPixels / np.maximum(depth, 1e-6)
+
+def lodLevel(diameter, thresholds):
+    # 0 for the finest level; len(thresholds) means lines / points
+    return np.sum(diameter[:, None] < np.asarray(thresholds)[None, :], axis=1)
+
+
+## Unit meshes
+def cylinderMesh(slices):
+    # Open cylinder of radius 1 along +Z from z=0 to z=1, like gluCylinder
+    angle = np.linspace(0.0, 2.0 * np.pi, slices, endpoint=False)
+    ring = np.stack((np.cos(angle), np.sin(angle), np.zeros(slices)), axis=1)
+    vertices = np.concatenate((ring, ring + (0.0, 0.0, 1.0))).astype(np.float32)
+    i = np.arange(slices)
+    j = (i + 1) % slices
+    indices = np.stack((i, j, i + slices, j, j + slices, i + slices), axis=1)
+    return vertices, indices.astype(np.uint32).ravel()
+
+def sphereMesh(slices, stacks):
+    theta = np.linspace(0.0, np.pi, stacks + 1)
+    phi = np.linspace(0.0, 2.0 * np.pi, slices + 1)
+    t, p = np.meshgrid(theta, phi, indexing="ij")
+    vertices = np.stack((np.sin(t) * np.cos(p), np.sin(t) * np.sin(p), np.cos(t)), axis=-1)
+    vertices = vertices.reshape(-1, 3).astype(np.float32)
+    row, col = np.meshgrid(np.arange(stacks), np.arange(slices), indexing="ij")
+    a = (row * (slices + 1) + col).ravel()
+    b = a + slices + 1
+    indices = np.stack((a, b, a + 1, a + 1, b, b + 1), axis=1)
+    return vertices, indices.astype(np.uint32).ravel()
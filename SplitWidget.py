@@ -2,7 +2,7 @@
 
 # "BVHPlayerPy" BVH Splitting Tools
 # Author: T.Shuhei
-# Last Modified: 2017/09/28
+# Last Modified: 2026/10/18
 
 # Using these icon resource:
 # https://vmware.github.io/clarity/icons/icon-sets#core-shapes
@@ -15,10 +15,43 @@ import os
 import numpy as np
 from PyQt5.Qt import *
 
-from python_bvh import BVH
+from BVHWriter import BVHWriter
+from MotionSplit import splitFileName, exportSegment
+from Segmentation import proposeSplits
+
+# Proposes splits of the primary actor off the GUI thread
+class ProposalThread(QThread):
+    splitsReady = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, actor, motion, frameTime, parent=None):
+        super().__init__(parent)
+        self.actor = actor
+        self.motion = motion
+        self.frameTime = frameTime
+        self.fCancel = False
+
+    def cancel(self):
+        self.fCancel = True
+
+    def isCancelled(self):
+        return self.fCancel
+
+    def run(self):
+        actor = self.actor
+        try:
+            splits = proposeSplits(actor.kinematics, self.motion, self.frameTime, actor.positions, isCancelled=self.isCancelled)
+        except InterruptedError:
+            return
+        except (IndexError, ValueError) as e:
+            self.failed.emit(str(e))
+            return
+        self.splitsReady.emit(splits)
 
 class SplitWidget(QGroupBox):
     hParentWidget = None
+    exportPrecision = 6
+    exportRates = (24, 30, 60, 120)
 
     def __init__(self, parent = None):
         super().__init__(parent)
@@ -26,6 +59,7 @@ class SplitWidget(QGroupBox):
         self.pathResourceDir = os.path.join(parent.pathCurrentDir, "IconResource")
         self.pathDstDir = parent.pathMotionFileDir
         self.setTitle("Motion Splitter")
+        self.proposalThread = None
 
         settingButtonLayout = QHBoxLayout()
         self.beginButton = QPushButton()
@@ -48,6 +82,13 @@ class SplitWidget(QGroupBox):
         self.delSplitButton.setFocusPolicy(Qt.NoFocus)
         self.delSplitButton.clicked.connect(self.deleteItem)
 
+        self.autoSplitButton = QPushButton("Auto")
+        settingButtonLayout.addWidget(self.autoSplitButton)
+        self.autoSplitButton.setEnabled(False)
+        self.autoSplitButton.setFocusPolicy(Qt.NoFocus)
+        self.autoSplitButton.setToolTip("Propose splits from rest poses, T-poses and movement speed")
+        self.autoSplitButton.clicked.connect(self.proposeItems)
+
         self.endButton = QPushButton()
         endIcon = beginIcon.transformed(QTransform(-1.0,  0.0, 0.0,
                                                     0.0, -1.0, 0.0,
@@ -58,11 +99,13 @@ class SplitWidget(QGroupBox):
         self.endButton.setFocusPolicy(Qt.NoFocus)
         self.endButton.clicked.connect(self.setEndFrame)
 
-        self.splitDataGrid = QTableWidget(0, 3)
-        self.splitDataGrid.setHorizontalHeaderLabels(["Enable", "Begin Frame","End Frame"])
+        self.splitDataGrid = QTableWidget(0, 4)
+        self.splitDataGrid.setHorizontalHeaderLabels(["Enable", "Begin Frame","End Frame", "FPS"])
         self.splitDataGrid.setColumnWidth(0, 45)
         self.splitDataGrid.setColumnWidth(1, 84)
         self.splitDataGrid.setColumnWidth(2, 84)
+        self.splitDataGrid.setColumnWidth(3, 45)
+        self.splitDataGrid.horizontalHeaderItem(3).setToolTip("Output frame rate of the row; empty uses the export setting")
         self.splitDataGrid.setSelectionMode(QAbstractItemView.ContiguousSelection)
         self.splitDataGrid.setSelectionBehavior(QAbstractItemView.SelectRows)
 
@@ -72,6 +115,23 @@ class SplitWidget(QGroupBox):
         self.dstinationButton.setFocusPolicy(Qt.NoFocus)
         self.dstinationButton.clicked.connect(self.setDestinationDir)
 
+        self.formatBox = QComboBox()
+        self.formatBox.addItem("BVH", "bvh")
+        self.formatBox.addItem("Binary", "npz")
+        self.formatBox.addItem("Positions (NPY)", "npy")
+        self.formatBox.addItem("Positions (Parquet)", "parquet")
+        self.formatBox.addItem("Positions (CSV)", "csv")
+        exportButtonsLayout.addWidget(self.formatBox)
+        self.formatBox.setFocusPolicy(Qt.NoFocus)
+
+        self.rateBox = QComboBox()
+        self.rateBox.addItem("Original fps", None)
+        for fps in self.exportRates:
+            self.rateBox.addItem(str(fps) + " fps", fps)
+        self.rateBox.setToolTip("Frame rate of rows with an empty FPS cell")
+        exportButtonsLayout.addWidget(self.rateBox)
+        self.rateBox.setFocusPolicy(Qt.NoFocus)
+
         self.exportButton = QPushButton()
         exportIcon = QPixmap(os.path.join(self.pathResourceDir, "export-solid.svg"))
         self.exportButton.setIcon(QIcon(exportIcon))
@@ -90,10 +150,12 @@ class SplitWidget(QGroupBox):
         self.beginButton.setEnabled(True)
         self.addSplitButton.setEnabled(True)
         self.delSplitButton.setEnabled(True)
+        self.autoSplitButton.setEnabled(True)
         self.endButton.setEnabled(True)
         self.exportButton.setEnabled(True)
 
     def initMotionData(self, filename, root, motion, frameTime):
+        self.cancelProposal()
         self.origFileName = filename
         self.root = root
         self.origMotion = motion
@@ -102,14 +164,51 @@ class SplitWidget(QGroupBox):
             self.splitDataGrid.removeRow(i)
 
     def createItem(self):
+        self.appendItem("", "", Qt.Checked)
+
+    def appendItem(self, begin, end, checkState):
         rows = self.splitDataGrid.rowCount()
         self.splitDataGrid.setRowCount(rows + 1)
         item = QTableWidgetItem()
         item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
-        item.setCheckState(Qt.Checked)
+        item.setCheckState(checkState)
         self.splitDataGrid.setItem(rows, 0, item)
-        self.splitDataGrid.setItem(rows, 1, QTableWidgetItem())
-        self.splitDataGrid.setItem(rows, 2, QTableWidgetItem())
+        self.splitDataGrid.setItem(rows, 1, QTableWidgetItem(str(begin)))
+        self.splitDataGrid.setItem(rows, 2, QTableWidgetItem(str(end)))
+        self.splitDataGrid.setItem(rows, 3, QTableWidgetItem(""))
+
+    # Proposed rows are left unchecked for the operator to review
+    def proposeItems(self):
+        self.cancelProposal()
+        self.autoSplitButton.setEnabled(False)
+        self.proposalThread = ProposalThread(self.hParentWidget.drawPanel.actors[0], self.origMotion, self.frameTime, self)
+        self.proposalThread.splitsReady.connect(self.appendProposals)
+        self.proposalThread.failed.connect(self.proposalFailed)
+        self.proposalThread.finished.connect(self.finishProposal)
+        self.proposalThread.start()
+
+    def cancelProposal(self):
+        if self.proposalThread is not None:
+            self.proposalThread.cancel()
+            self.proposalThread.wait()
+            self.proposalThread.deleteLater()
+            self.proposalThread = None
+            self.autoSplitButton.setEnabled(True)
+
+    def appendProposals(self, splits):
+        if self.sender() is self.proposalThread:
+            for begin, end in splits:
+                self.appendItem(begin, end, Qt.Unchecked)
+
+    def proposalFailed(self, message):
+        if self.sender() is self.proposalThread:
+            self.hParentWidget.statusBar().showMessage("Failed to propose splits: " + message)
+
+    def finishProposal(self):
+        if self.sender() is self.proposalThread:
+            self.proposalThread.deleteLater()
+            self.proposalThread = None
+            self.autoSplitButton.setEnabled(True)
 
     def setBeginFrame(self):
         if self.splitDataGrid.rowCount() != 0:
@@ -151,25 +250,35 @@ class SplitWidget(QGroupBox):
     def exportSplittedBVH(self):
         if self.splitDataGrid.rowCount() != 0:
             splitdata = []
+            batchRate = self.rateBox.currentData()
             for row in range(0, self.splitDataGrid.rowCount()):
                 if self.splitDataGrid.item(row, 0).checkState() == Qt.Checked:
                     try:
                         begin = int(self.splitDataGrid.item(row, 1).text())
                         end = int(self.splitDataGrid.item(row, 2).text())
-                        if begin >= end:
+                        if (begin >= end) or (begin < 0) or (end > len(self.origMotion)):
                             raise ValueError
-                        splitdata.append((row, begin, end))
+                        item = self.splitDataGrid.item(row, 3)
+                        fps = float(item.text()) if (item is not None) and (item.text().strip() != "") else batchRate
+                        if (fps is not None) and (fps <= 0):
+                            raise ValueError
+                        splitdata.append((row, begin, end, None if fps is None else 1.0 / fps))
                     except ValueError:
                         pass
             
             if len(splitdata) != 0:
                 progress = QProgressDialog()
                 progress.setRange(0, len(splitdata))
+                writer = BVHWriter(self.exportPrecision)
+                fileFormat = self.formatBox.currentData()
                 for i, data in enumerate(splitdata):
-                    row, begin, end = data
-                    strRow = str(row) if row > 10 else "0" + str(row)
-                    dstFilePath = os.path.join(self.pathDstDir, self.origFileName.split(".")[0] + "_" + strRow + ".bvh")
-                    motion = self.origMotion[begin:end]
-                    BVH.writeBVH(dstFilePath, self.root, motion, end - begin, self.frameTime)
+                    row, begin, end, targetFrameTime = data
+                    dstFilePath = os.path.join(self.pathDstDir, splitFileName(self.origFileName, row, fileFormat))
+                    try:
+                        exportSegment(dstFilePath, self.root, self.origMotion, begin, end, self.frameTime, writer, fileFormat,
+                                      targetFrameTime)
+                    except ImportError as e:
+                        QMessageBox.warning(self, "BVH Player", str(e))
+                        break
                     self.splitDataGrid.item(row, 0).setCheckState(Qt.Unchecked)
                     progress.setValue(i+1)
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Timeline scrubber with motion energy overview
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import numpy as np
+from PyQt5.Qt import *
+
+from MotionEnergy import motionEnergy, EnergyPyramid
+from Comparison import compareTakes
+
+# Computes the energy curve of the primary actor off the GUI thread
+class EnergyThread(QThread):
+    energyReady = pyqtSignal(object)
+
+    def __init__(self, actor, parent=None):
+        super().__init__(parent)
+        self.actor = actor
+        self.fCancel = False
+
+    def cancel(self):
+        self.fCancel = True
+
+    def isCancelled(self):
+        return self.fCancel
+
+    def run(self):
+        actor = self.actor
+        try:
+            energy = motionEnergy(actor.kinematics, actor.motion, actor.frameTime, actor.positions, isCancelled=self.isCancelled)
+        except (InterruptedError, IndexError, ValueError):
+            return
+        self.energyReady.emit(EnergyPyramid(energy))
+
+# Compares a second take against the primary actor off the GUI thread
+class ComparisonThread(QThread):
+    comparisonReady = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, actorA, actorB, fAlign, parent=None):
+        super().__init__(parent)
+        self.actorA = actorA
+        self.actorB = actorB
+        self.fAlign = fAlign
+        self.fCancel = False
+
+    def cancel(self):
+        self.fCancel = True
+
+    def isCancelled(self):
+        return self.fCancel
+
+    def run(self):
+        a, b = self.actorA, self.actorB
+        try:
+            comparison = compareTakes(a.kinematics, a.motion, b.kinematics, b.motion, self.fAlign, isCancelled=self.isCancelled)
+        except InterruptedError:
+            return
+        except (IndexError, ValueError) as e:
+            self.failed.emit(str(e))
+            return
+        self.comparisonReady.emit(comparison)
+
+
+# Drawn one min/max column per pixel, so the cost does not depend on the zoom.
+# Click or drag to seek, wheel to zoom around the cursor, Shift+wheel to pan.
+# While two takes are compared, the curve is their mean joint distance instead.
+class TimelineWidget(QWidget):
+    comparisonReady = pyqtSignal(object)
+    comparisonFailed = pyqtSignal(str)
+    hParentWidget = None
+    zoomStep = 1.25
+    curveColor = QColor(255, 140, 0)
+    errorColor = QColor(220, 20, 60)
+    playheadColor = QColor(255, 255, 255)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hParentWidget = parent
+        self.setMinimumHeight(60)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.frames = 0
+        self.frame = 0
+        self.viewBegin = 0.0
+        self.viewEnd = 1.0
+        self.pyramid = None
+        self.energyThread = None
+        self.comparisonThread = None
+        self.comparison = None
+
+    def setMotion(self, actor):
+        self.cancelEnergy()
+        self.cancelComparison()
+        self.frames = actor.frames
+        self.frame = 0
+        self.viewBegin, self.viewEnd = 0.0, float(max(1, actor.frames))
+        self.pyramid = None
+        self.energyThread = EnergyThread(actor, self)
+        self.energyThread.energyReady.connect(self.setPyramid)
+        self.energyThread.start()
+        self.update()
+
+    def cancelEnergy(self):
+        if self.energyThread is not None:
+            self.energyThread.cancel()
+            self.energyThread.wait()
+            self.energyThread.deleteLater()
+            self.energyThread = None
+
+    def setPyramid(self, pyramid):
+        if (self.sender() is self.energyThread) and (self.comparison is None):
+            self.pyramid = pyramid
+            self.update()
+
+    # Per-frame error of actorB against actorA, optionally time-warped onto it
+    def compare(self, actorA, actorB, fAlign=False):
+        self.cancelComparison()
+        self.comparisonThread = ComparisonThread(actorA, actorB, fAlign, self)
+        self.comparisonThread.comparisonReady.connect(self.setComparison)
+        self.comparisonThread.failed.connect(self.comparisonFailed)
+        self.comparisonThread.start()
+
+    def cancelComparison(self):
+        if self.comparisonThread is not None:
+            self.comparisonThread.cancel()
+            self.comparisonThread.wait()
+            self.comparisonThread.deleteLater()
+            self.comparisonThread = None
+        self.comparison = None
+
+    def setComparison(self, comparison):
+        if self.sender() is self.comparisonThread:
+            self.cancelEnergy()
+            self.comparison = comparison
+            self.pyramid = EnergyPyramid(comparison.frameError)
+            self.update()
+            self.comparisonReady.emit(comparison)
+
+    def setFrame(self, frame):
+        self.frame = frame
+        self.update()
+
+    def frameAt(self, x):
+        span = self.viewEnd - self.viewBegin
+        frame = int(self.viewBegin + span * x / max(1, self.width()))
+        return int(np.clip(frame, 0, max(0, self.frames - 1)))
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(51, 51, 51))
+        if self.frames == 0:
+            return
+        width, height = self.width(), self.height()
+
+        if self.pyramid is not None:
+            lo, hi = self.pyramid.envelope(self.viewBegin, self.viewEnd, width)
+            top = self.pyramid.maxValue if self.pyramid.maxValue > 0 else 1.0
+            y0 = height - 1 - (lo / top * (height - 2)).astype(np.int64)
+            y1 = height - 1 - (hi / top * (height - 2)).astype(np.int64)
+            painter.setPen(self.curveColor if self.comparison is None else self.errorColor)
+            painter.drawLines([QLine(x, int(a), x, int(b)) for x, (a, b) in enumerate(zip(y0, y1))])
+
+        x = int((self.frame - self.viewBegin) / (self.viewEnd - self.viewBegin) * width)
+        painter.setPen(self.playheadColor)
+        painter.drawLine(x, 0, x, height)
+        if (self.comparison is not None) and (0 <= self.frame < len(self.comparison.matches)):
+            text = "error %.2f  (%.2f max)" % (self.comparison.frameError[self.frame], self.pyramid.maxValue)
+            painter.drawText(4, 14, text)
+
+    ## Mouse Events
+    def mousePressEvent(self, event:QMouseEvent):
+        self.seek(event.x())
+
+    def mouseMoveEvent(self, event:QMouseEvent):
+        if event.buttons() & Qt.LeftButton:
+            self.seek(event.x())
+
+    def seek(self, x):
+        if self.frames > 0:
+            self.hParentWidget.drawPanel.seek(self.frameAt(x))
+
+    def wheelEvent(self, event:QWheelEvent):
+        if self.frames == 0:
+            return
+        steps = event.angleDelta().y() / 120.0
+        span = self.viewEnd - self.viewBegin
+        if event.modifiers() & Qt.ShiftModifier:
+            shift = -steps * 0.1 * span
+            shift = np.clip(shift, -self.viewBegin, self.frames - self.viewEnd)
+            self.viewBegin += shift
+            self.viewEnd += shift
+        else:
+            anchor = self.viewBegin + span * event.x() / max(1, self.width())
+            newSpan = np.clip(span / self.zoomStep ** steps, min(16.0, self.frames), float(self.frames))
+            self.viewBegin = np.clip(anchor - (anchor - self.viewBegin) * newSpan / span, 0.0, self.frames - newSpan)
+            self.viewEnd = self.viewBegin + newSpan
+        self.update()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+# "BVHPlayerPy" Joint trajectory trails
+# Author: T.Shuhei
+# Last Modified: 2026/10/18
+
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+
+from Actor import Actor
+
+# Points of one actor over a window of frames around the current one, kept in a
+# vertex buffer used as a ring: moving the window only evaluates and uploads the
+# frames that entered it. Frame f lives in slots f % W and f % W + W (W = window
+# length), so the window is always one contiguous run of slots.
+class TrailBuffer:
+    pastFrames = 120
+    futureFrames = 60
+    pastColor = (1.000, 0.843, 0.000)
+    futureColor = (0.400, 0.400, 0.800)
+
+    def __init__(self):
+        self.vbo = None
+        self.allocated = 0      # bytes
+        self.actor = None
+        self.points = np.zeros(0, dtype=np.int64)
+        self.lo = self.hi = 0       # frames [lo, hi) are resident
+
+    @property
+    def capacity(self):
+        return self.pastFrames + self.futureFrames + 1
+
+    # points index the actor's pose (joints, then end sites); needs no GL context
+    def setSource(self, actor:Actor, points):
+        points = np.asarray(points, dtype=np.int64)
+        if (actor is not self.actor) or not np.array_equal(points, self.points):
+            self.actor = actor
+            self.points = points
+            self.lo = self.hi = 0
+
+    # Must be called with the GL context current
+    def update(self, frame):
+        if (self.actor is None) or (len(self.points) == 0):
+            return
+        if self.vbo is None:
+            self.vbo = glGenBuffers(1)
+        size = 2 * self.capacity * len(self.points) * 12
+        if size != self.allocated:
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glBufferData(GL_ARRAY_BUFFER, size, None, GL_DYNAMIC_DRAW)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            self.allocated = size
+            self.lo = self.hi = 0
+        lo = max(0, frame - self.pastFrames)
+        hi = min(self.actor.availableFrames(), frame + self.futureFrames + 1)
+        if (hi <= self.lo) or (lo >= self.hi):
+            missing = [(lo, hi)]
+        else:
+            missing = [(lo, min(hi, self.lo)), (max(lo, self.hi), hi)]
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        for begin, end in missing:
+            if begin < end:
+                self._upload(begin, end)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.lo, self.hi = lo, hi
+
+    def _upload(self, begin, end):
+        actor = self.actor
+        if actor.positions is not None:
+            points = actor.positions[begin:end][:, self.points]
+        else:
+            points = actor.kinematics.jointPositions(actor.motion[begin:end])[:, self.points]
+        data = np.ascontiguousarray(points + actor.offset, dtype=np.float32)
+        stride = len(self.points) * 12
+        first = begin
+        while first < end:      # split where the slots wrap around
+            slot = first % self.capacity
+            last = min(end, first + self.capacity - slot)
+            block = data[first - begin:last - begin]
+            glBufferSubData(GL_ARRAY_BUFFER, slot * stride, block.nbytes, block)
+            glBufferSubData(GL_ARRAY_BUFFER, (slot + self.capacity) * stride, block.nbytes, block)
+            first = last
+
+    # One line strip per point for the past and one for the future, meeting at frame
+    def draw(self, frame):
+        if (self.vbo is None) or (self.hi <= self.lo):
+            return
+        frame = int(np.clip(frame, self.lo, self.hi - 1))
+        start = self.lo % self.capacity
+        stride = len(self.points) * 12
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        for color, first, count in ((self.pastColor, self.lo, frame - self.lo + 1), (self.futureColor, frame, self.hi - frame)):
+            if count < 2:
+                continue
+            glColor3f(*color)
+            for j in range(len(self.points)):
+                glVertexPointer(3, GL_FLOAT, stride, ctypes.c_void_p((start + first - self.lo) * stride + j * 12))
+                glDrawArrays(GL_LINE_STRIP, 0, count)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)